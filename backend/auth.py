@@ -1,10 +1,15 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Callable, Any, Dict
+from concurrent.futures import ThreadPoolExecutor
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from models import CurrentUser, UserRole
+from database import Database
+import asyncio
 import os
+import threading
 
 # Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
@@ -14,6 +19,13 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event loop.
+# At most PASSWORD_HASH_WORKERS hashes run at once; the rest wait in the pool queue.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_password_stats = {"queued": 0, "running": 0, "completed": 0, "max_queued": 0}
+_password_stats_lock = threading.Lock()
+
 # OAuth2 scheme
 security = HTTPBearer()
 
@@ -25,6 +37,39 @@ def get_password_hash(password: str) -> str:
     """Hash a password."""
     return pwd_context.hash(password)
 
+def _run_password_job(func: Callable[..., Any], *args) -> Any:
+    """Run a password job on a pool thread, keeping queue statistics."""
+    with _password_stats_lock:
+        _password_stats["queued"] -= 1
+        _password_stats["running"] += 1
+    try:
+        return func(*args)
+    finally:
+        with _password_stats_lock:
+            _password_stats["running"] -= 1
+            _password_stats["completed"] += 1
+
+async def _submit_password_job(func: Callable[..., Any], *args) -> Any:
+    """Queue a password job on the password executor and await its result."""
+    with _password_stats_lock:
+        _password_stats["queued"] += 1
+        _password_stats["max_queued"] = max(_password_stats["max_queued"], _password_stats["queued"])
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, _run_password_job, func, *args)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password without blocking the event loop."""
+    return await _submit_password_job(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password without blocking the event loop."""
+    return await _submit_password_job(get_password_hash, password)
+
+def password_hashing_stats() -> Dict[str, int]:
+    """Return password executor concurrency and queue depth counters."""
+    with _password_stats_lock:
+        return {"workers": PASSWORD_HASH_WORKERS, **_password_stats}
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -61,6 +106,23 @@ async def get_current_user_email(credentials: HTTPAuthorizationCredentials = Dep
     payload = verify_token(credentials.credentials)
     return payload.get("sub")
 
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> CurrentUser:
+    """Get the current user's id, email and role from JWT token claims."""
+    payload = verify_token(credentials.credentials)
+    user_id = payload.get("uid")
+    if user_id:
+        return CurrentUser(id=user_id, email=payload["sub"], role=payload.get("role", UserRole.USER))
+    
+    # Tokens issued before the uid claim existed need one lookup
+    user = await Database.get_user_by_email(payload["sub"])
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return CurrentUser(id=user.id, email=user.email, role=user.role)
+
 async def get_current_admin_email(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
     """Get current admin email from JWT token."""
     payload = verify_token(credentials.credentials)
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Load test for the storefront API.
+
+Drives concurrent asyncio traffic through one scenario at a time: catalog
+browsing, search, product detail, login, cart add/update/remove and checkout.
+Prints throughput and p50/p95/p99 latency per scenario as JSON, so runs of two
+releases can be diffed. Checkout places real orders and takes tracked stock, so
+409 responses once products sell out count as errors.
+
+By default the app runs in-process over httpx's ASGI transport against the
+Mongo in MONGO_URL (or --mongo-url), using a separate benchmark database. Use a
+local mongod or any disposable Mongo-compatible server; the run registers
+users and writes carts and orders. Client and server share one event loop in this mode,
+so compare in-process numbers only with other in-process runs. Pass --url to
+load a server that is already running instead.
+
+Usage:
+    python benchmarks/load_test.py --catalog 20000
+    python benchmarks/load_test.py --scenarios browse,search --duration 20 --output before.json
+    python benchmarks/load_test.py --url http://localhost:8001 --concurrency 64
+    python benchmarks/load_test.py --scenarios checkout --concurrency 64
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+import httpx
+
+SEARCH_TERMS = ["robot", "süpürge", "kahve", "blender", "ütü", "koşu bandı", "bisiklet", "yoga", "dambıl", "akıllı"]
+PASSWORD = "password123"
+PAGE_SIZE = 24
+SHIPPING_ADDRESS = {
+    "full_name": "Yük Testi",
+    "phone": "05550000000",
+    "address_line": "Test Sokak No:1",
+    "city": "İstanbul",
+    "postal_code": "34000",
+}
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Return the value at a fraction of a sorted list"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+class Recorder:
+    """Collects latencies and failures per operation"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+
+    async def timed(self, name: str, request) -> httpx.Response:
+        """Await a request, recording its latency or counting it as failed"""
+        started = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError:
+            self.errors[name] = self.errors.get(name, 0) + 1
+            return None
+        elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            self.errors[name] = self.errors.get(name, 0) + 1
+        else:
+            self.latencies.setdefault(name, []).append(elapsed)
+        return response
+
+    def summary(self, elapsed: float) -> dict:
+        """Return throughput and latency percentiles per operation"""
+        results = {}
+        for name in sorted(set(self.latencies) | set(self.errors)):
+            latencies = sorted(self.latencies.get(name, []))
+            results[name] = {
+                "requests": len(latencies),
+                "errors": self.errors.get(name, 0),
+                "throughput_rps": round(len(latencies) / elapsed, 1),
+                "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+                "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+                "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+            }
+        return results
+
+class Shopper:
+    """A registered benchmark user"""
+
+    def __init__(self, email: str, token: str):
+        self.email = email
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+async def browse(client, recorder, rng, context, shopper):
+    """Open a listing page, sometimes of one category"""
+    params = {"page": rng.choice([1, 1, 1, 2, 3]), "limit": PAGE_SIZE, "view": "summary"}
+    if context["categories"] and rng.random() < 0.5:
+        params["category"] = rng.choice(context["categories"])
+    await recorder.timed("browse", client.get("/api/products/", params=params))
+
+async def search(client, recorder, rng, context, shopper):
+    """Search the catalog"""
+    params = {"search": rng.choice(SEARCH_TERMS), "limit": PAGE_SIZE, "view": "summary"}
+    await recorder.timed("search", client.get("/api/products/", params=params))
+
+async def detail(client, recorder, rng, context, shopper):
+    """Open a product page"""
+    await recorder.timed("detail", client.get(f"/api/products/{rng.choice(context['product_ids'])}"))
+
+async def login(client, recorder, rng, context, shopper):
+    """Log in with the shopper's password"""
+    await recorder.timed("login", client.post("/api/auth/login", json={"email": shopper.email, "password": PASSWORD}))
+
+async def cart(client, recorder, rng, context, shopper):
+    """Add a product, change its quantity and remove it again"""
+    product_id = rng.choice(context["product_ids"])
+    item = {"product_id": product_id, "quantity": 1}
+    response = await recorder.timed("cart_add", client.post("/api/cart/add", json=item, headers=shopper.headers))
+    if response is None or response.status_code >= 400:
+        return
+    item["quantity"] = rng.randint(2, 4)
+    await recorder.timed("cart_update", client.put("/api/cart/update", json=item, headers=shopper.headers))
+    await recorder.timed("cart_remove", client.delete(
+        "/api/cart/remove", params={"product_id": product_id}, headers=shopper.headers
+    ))
+
+async def checkout(client, recorder, rng, context, shopper):
+    """Order 1-3 random products"""
+    product_ids = rng.sample(context["product_ids"], min(len(context["product_ids"]), rng.randint(1, 3)))
+    order = {
+        "items": [{"product_id": product_id, "quantity": rng.randint(1, 2)} for product_id in product_ids],
+        "shipping_address": SHIPPING_ADDRESS,
+        "payment_method": "iyzico",
+    }
+    await recorder.timed("checkout", client.post("/api/orders/", json=order, headers=shopper.headers))
+
+SCENARIO_FUNCTIONS = {"browse": browse, "search": search, "detail": detail, "login": login, "cart": cart, "checkout": checkout}
+
+async def register_shoppers(client: httpx.AsyncClient, count: int) -> list:
+    """Register throwaway users, a few at a time"""
+    run_tag = uuid.uuid4().hex[:8]
+    semaphore = asyncio.Semaphore(8)
+
+    async def register(number: int) -> Shopper:
+        email = f"bench-{run_tag}-{number}@example.com"
+        async with semaphore:
+            response = await client.post("/api/auth/register", json={
+                "name": f"Yük Testi {number}", "email": email, "password": PASSWORD
+            })
+        response.raise_for_status()
+        return Shopper(email, response.json()["access_token"])
+
+    return await asyncio.gather(*(register(number) for number in range(count)))
+
+async def load_context(client: httpx.AsyncClient) -> dict:
+    """Fetch product IDs and category slugs to pick from"""
+    products = await client.get("/api/products/", params={"limit": 100, "view": "summary"})
+    products.raise_for_status()
+    categories = await client.get("/api/categories/")
+    categories.raise_for_status()
+    return {
+        "product_ids": [product["_id"] for product in products.json()["products"] if product["in_stock"]],
+        "categories": [category["slug"] for category in categories.json()],
+    }
+
+async def run_scenario(client, scenario, context, shoppers, concurrency: int, duration: float, seed: int) -> Recorder:
+    """Run one scenario with concurrent workers for a fixed time"""
+    recorder = Recorder()
+    deadline = time.perf_counter() + duration
+
+    async def worker(index: int):
+        rng = random.Random(seed + index)
+        # Each worker keeps its own shopper so cart lines do not collide
+        shopper = shoppers[index % len(shoppers)]
+        while time.perf_counter() < deadline:
+            await scenario(client, recorder, rng, context, shopper)
+
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    return recorder
+
+async def benchmark(args, client: httpx.AsyncClient) -> dict:
+    """Prepare users and run every selected scenario"""
+    context = await load_context(client)
+    if not context["product_ids"]:
+        raise SystemExit("No in-stock products to benchmark with")
+    shoppers = await register_shoppers(client, max(args.users, args.concurrency))
+
+    results = {}
+    for name in args.scenarios:
+        scenario = SCENARIO_FUNCTIONS[name]
+        if args.warmup:
+            await run_scenario(client, scenario, context, shoppers, args.concurrency, args.warmup, args.seed)
+        started = time.perf_counter()
+        recorder = await run_scenario(client, scenario, context, shoppers, args.concurrency, args.duration, args.seed)
+        results.update(recorder.summary(time.perf_counter() - started))
+    return results
+
+async def main(args) -> dict:
+    if args.url:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=args.url.rstrip("/"), timeout=30, limits=limits) as client:
+            results = await benchmark(args, client)
+        target = args.url
+    else:
+        # database.py reads these at import time; .env does not override them
+        if args.mongo_url:
+            os.environ["MONGO_URL"] = args.mongo_url
+        os.environ["DB_NAME"] = args.db_name
+        if args.catalog:
+            from generate_catalog import generate
+            await generate(products=args.catalog, users=0, carts=0, orders=0, batch_size=5000, seed=args.seed, drop=True)
+
+        from server import app
+        await app.router.startup()
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30) as client:
+                results = await benchmark(args, client)
+        finally:
+            await app.router.shutdown()
+        target = f"in-process ({args.db_name})"
+
+    return {
+        "target": target,
+        "started_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "concurrency": args.concurrency,
+        "duration_seconds": args.duration,
+        "scenarios": results,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the storefront API")
+    parser.add_argument("--url", help="base URL of a running server; default runs the app in-process")
+    parser.add_argument("--mongo-url", help="Mongo for in-process runs, defaults to MONGO_URL")
+    parser.add_argument("--db-name", default="roboturkiye_bench", help="database for in-process runs")
+    parser.add_argument("--catalog", type=int, default=0, help="drop the benchmark database and generate this many products first")
+    parser.add_argument("--scenarios", default=",".join(SCENARIO_FUNCTIONS), help=f"comma-separated subset of {', '.join(SCENARIO_FUNCTIONS)}")
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unrecorded seconds before each scenario")
+    parser.add_argument("--users", type=int, default=32, help="users to register, at least one per worker")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for request mixes")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(args.scenarios) - set(SCENARIO_FUNCTIONS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    report = json.dumps(asyncio.run(main(args)), indent=2, ensure_ascii=False)
+    print(report)
+    if args.output:
+        Path(args.output).write_text(report + "\n", encoding="utf-8")
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark for GET /api/products response rendering.
+
+Measures two things:
+  * in-process rendering of a listing page, comparing the old path (build
+    ProductResponse models, jsonable_encoder, json.dumps) with the cached
+    orjson payload path, so the gain is visible without a database;
+  * requests per second against a running server when --url is given. Run it
+    once against the previous build and once against this one to compare.
+
+Usage:
+    python benchmarks/products_listing.py
+    python benchmarks/products_listing.py --url http://localhost:8001 --requests 2000 --concurrency 32
+"""
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+import orjson
+import requests
+from fastapi.encoders import jsonable_encoder
+
+from data.mockData import mockProducts
+from load_test import percentile
+from models import ProductInDB, ProductResponse, ProductListResponse
+from serialization import product_list_content
+
+def make_products(count: int) -> list:
+    """Build a page of realistic products from the mock catalog"""
+    products = []
+    for index in range(count):
+        mock_product = mockProducts[index % len(mockProducts)]
+        products.append(ProductInDB(
+            name=mock_product["name"],
+            description=f"{mock_product['name']} - Yüksek kalite, garantili ürün. Hızlı kargo ile kapınızda!",
+            image=mock_product["image"],
+            original_price=mock_product["originalPrice"],
+            current_price=mock_product["currentPrice"],
+            rating=mock_product["rating"],
+            category=mock_product["category"],
+            badge=mock_product.get("badge"),
+            in_stock=True
+        ))
+    return products
+
+def render_before(products: list) -> bytes:
+    """Render a page the way the routers did before cached payloads"""
+    product_responses = [
+        ProductResponse(
+            _id=product.id,
+            name=product.name,
+            description=product.description,
+            image=product.image,
+            original_price=product.original_price,
+            current_price=product.current_price,
+            rating=product.rating,
+            category=product.category,
+            badge=product.badge,
+            in_stock=product.in_stock,
+            created_at=product.created_at,
+            updated_at=product.updated_at
+        )
+        for product in products
+    ]
+    response = ProductListResponse(products=product_responses, total_pages=1, current_page=1, total_count=len(products))
+    # FastAPI re-validates the returned model against response_model before encoding it
+    response = ProductListResponse.model_validate(response.model_dump(by_alias=True))
+    return json.dumps(jsonable_encoder(response), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def render_after(products: list) -> bytes:
+    """Render a page from cached orjson product payloads"""
+    return orjson.dumps(product_list_content(products, total_pages=1, current_page=1, total_count=len(products)))
+
+def time_renders(render, products: list, seconds: float) -> float:
+    """Return renders per second over roughly the given duration"""
+    render(products)
+    count = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        render(products)
+        count += 1
+    return count / (time.perf_counter() - started)
+
+def time_http(url: str, total: int, concurrency: int, limit: int) -> dict:
+    """Drive GET /api/products with concurrent clients and return throughput and latency"""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    endpoint = f"{url.rstrip('/')}/api/products/?limit={limit}"
+
+    def fetch(_):
+        started = time.perf_counter()
+        response = session.get(endpoint)
+        response.raise_for_status()
+        return time.perf_counter() - started
+
+    fetch(0)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = sorted(executor.map(fetch, range(total)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests_per_second": total / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /api/products rendering")
+    parser.add_argument("--page-size", type=int, default=50, help="products per listing page")
+    parser.add_argument("--seconds", type=float, default=3.0, help="duration of each in-process run")
+    parser.add_argument("--url", help="base URL of a running server to load test")
+    parser.add_argument("--requests", type=int, default=1000, help="HTTP requests to send")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent HTTP clients")
+    args = parser.parse_args()
+
+    products = make_products(args.page_size)
+    before = time_renders(render_before, products, args.seconds)
+    after = time_renders(render_after, products, args.seconds)
+    results = {
+        "page_size": args.page_size,
+        "render_per_second_before": round(before, 1),
+        "render_per_second_after": round(after, 1),
+        "speedup": round(after / before, 2),
+    }
+
+    if args.url:
+        results["http"] = time_http(args.url, args.requests, args.concurrency, args.page_size)
+
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
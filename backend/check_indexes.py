@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Report which Database query shapes would scan a whole collection.
+
+Runs each entry of database.QUERY_SHAPES through Mongo's query planner and
+flags winning plans that contain a COLLSCAN stage. Pass --apply to create any
+missing registered indexes first. Exits with status 1 when an unexpected scan
+is found, so it can run in CI.
+"""
+
+import argparse
+import asyncio
+import sys
+from dotenv import load_dotenv
+from pathlib import Path
+
+# Load environment variables
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+from database import db, ensure_indexes, QUERY_SHAPES
+
+def plan_stages(plan) -> list:
+    """Collect every stage name in an explain plan tree"""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(plan_stages(value))
+    return stages
+
+async def explain_shape(shape: dict) -> list:
+    """Return the winning plan stages for a query shape"""
+    find = {"find": shape["collection"], "filter": shape["filter"]}
+    if shape.get("sort"):
+        find["sort"] = dict(shape["sort"])
+    result = await db.command({"explain": find, "verbosity": "queryPlanner"})
+    return plan_stages(result["queryPlanner"]["winningPlan"])
+
+async def check_indexes(apply: bool = False) -> int:
+    """Print a report of query shapes and return the number of unexpected scans"""
+    if apply:
+        created = await ensure_indexes()
+        for collection_name, names in created.items():
+            if names:
+                print(f"Ensured indexes on {collection_name}: {', '.join(names)}")
+
+    unexpected = 0
+    for shape in QUERY_SHAPES:
+        stages = await explain_shape(shape)
+        if "COLLSCAN" not in stages:
+            status = "ok"
+        elif shape.get("expect_scan"):
+            status = "scan (expected)"
+        else:
+            status = "COLLSCAN"
+            unexpected += 1
+        print(f"{status:<16} {shape['collection']:<11} {shape['name']:<32} {' > '.join(stages)}")
+
+    print(f"\n{unexpected} unexpected collection scan(s)")
+    return unexpected
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--apply", action="store_true", help="create missing registered indexes before checking")
+    args = parser.parse_args()
+    sys.exit(1 if asyncio.run(check_indexes(apply=args.apply)) else 0)
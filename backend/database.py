@@ -1,6 +1,16 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from typing import Optional, List, Dict, Any
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReadPreference, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure, PyMongoError
+from pydantic import BaseModel
+from typing import Optional, List, Dict, Any, AsyncIterator, Callable, Type
+from bisect import bisect_right
+from datetime import timedelta
+import asyncio
 import os
+import logging
+import re
+import time
+import uuid
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -9,22 +19,316 @@ ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 from models import *
+from search import ListingFields, product_search_index, suggestion_index
+from cache import LRUCache
+from pagination import encode_cursor, decode_cursor, keyset_filter, keyset_position
+from metrics import MongoCommandMetrics, MongoPoolMetrics, register_cache
+
+logger = logging.getLogger(__name__)
 
 # Database connection
 mongo_url = os.environ.get('MONGO_URL')
 if not mongo_url:
     raise ValueError("MONGO_URL environment variable is not set")
 
-client = AsyncIOMotorClient(mongo_url)
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+# Products and categories tolerate slightly stale reads (they are cached anyway);
+# users, carts and orders always read from the primary
+CATALOG_READ_PREFERENCE = READ_PREFERENCES[os.environ.get('CATALOG_READ_PREFERENCE', 'secondaryPreferred')]
+MONGO_PING_TIMEOUT = float(os.environ.get('MONGO_PING_TIMEOUT', '2'))
+
+def create_client(url: str) -> AsyncIOMotorClient:
+    """Build the Motor client from the MONGO_* pool, timeout and compression settings"""
+    options = {
+        "minPoolSize": int(os.environ.get('MONGO_MIN_POOL_SIZE', '0')),
+        "maxPoolSize": int(os.environ.get('MONGO_MAX_POOL_SIZE', '100')),
+        # Fail a request that cannot get a connection instead of queueing it indefinitely
+        "waitQueueTimeoutMS": int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', '5000')),
+        "serverSelectionTimeoutMS": int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000')),
+        "connectTimeoutMS": int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '5000')),
+        # zstd needs the zstandard package; add snappy here if python-snappy is installed
+        "compressors": os.environ.get('MONGO_COMPRESSORS', 'zstd,zlib'),
+        # Commands and pool activity are exported on /api/metrics
+        "event_listeners": [MongoCommandMetrics(), MongoPoolMetrics()],
+    }
+    socket_timeout = os.environ.get('MONGO_SOCKET_TIMEOUT_MS')
+    if socket_timeout:
+        options["socketTimeoutMS"] = int(socket_timeout)
+    return AsyncIOMotorClient(url, **options)
+
+client = create_client(mongo_url)
 db = client[os.environ.get('DB_NAME', 'roboturkiye')]
 
+# Listing sorts by name: (field, direction). _id in the same direction breaks ties for keyset paging.
+# "default" keeps the original creation order; with a search it means relevance.
+PRODUCT_SORTS: Dict[str, tuple[str, int]] = {
+    "default": ("created_at", ASCENDING),
+    "newest": ("created_at", DESCENDING),
+    "price_asc": ("current_price", ASCENDING),
+    "price_desc": ("current_price", DESCENDING),
+    "rating": ("rating", DESCENDING),
+}
+PRODUCT_SORT = [("created_at", ASCENDING), ("_id", ASCENDING)]
+
+# Lower bounds of the price facet buckets; prices from the last bound up share one bucket
+PRICE_FACET_BOUNDARIES = [0, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+# Non-exact product counts are served from here for a short while
+COUNT_CACHE_TTL = float(os.environ.get('COUNT_CACHE_TTL', '30'))
+# Keyed by the raw query, which includes client-chosen prices and badges, so it is bounded
+_count_cache = LRUCache(
+    maxsize=int(os.environ.get('COUNT_CACHE_SIZE', '1000')),
+    ttl=COUNT_CACHE_TTL
+)
+
+# Search results ranked, filtered and sorted in memory, keyed by the search index version so
+# index changes invalidate them; a listing's page, count and facets share one ranking.
+# Results can list the whole catalog, so only a few are kept.
+search_result_cache = LRUCache(
+    maxsize=int(os.environ.get('SEARCH_RESULT_CACHE_SIZE', '16')),
+    ttl=COUNT_CACHE_TTL
+)
+
+# Other workers write products too; their writes reach this worker's in-memory
+# indexes within this many seconds (0 disables the sync)
+SEARCH_INDEX_SYNC_INTERVAL = float(os.environ.get('SEARCH_INDEX_SYNC_INTERVAL', '30'))
+# Each sync re-reads this much before the last one, to allow for clock skew between workers
+SEARCH_INDEX_SYNC_OVERLAP = timedelta(seconds=float(os.environ.get('SEARCH_INDEX_SYNC_OVERLAP', '5')))
+SEARCH_INDEX_PROJECTION = {
+    "name": 1, "description": 1, "category": 1, "rating": 1,
+    "current_price": 1, "badge": 1, "in_stock": 1, "created_at": 1
+}
+# Start of the last index load or sync; None until the index is first built
+_search_index_synced_at: Optional[datetime] = None
+
+# Read-through cache for single product lookups, invalidated on every product write
+product_cache = LRUCache(
+    maxsize=int(os.environ.get('PRODUCT_CACHE_SIZE', '10000')),
+    ttl=float(os.environ.get('PRODUCT_CACHE_TTL', '300'))
+)
+
+# Short-lived cache of full user records, keyed by user ID
+user_cache = LRUCache(
+    maxsize=int(os.environ.get('USER_CACHE_SIZE', '10000')),
+    ttl=float(os.environ.get('USER_CACHE_TTL', '60'))
+)
+register_cache("product", product_cache)
+register_cache("user", user_cache)
+register_cache("search_result", search_result_cache)
+register_cache("count", _count_cache)
+
 # Collections
 users_collection = db.users
-products_collection = db.products
-categories_collection = db.categories
+products_collection = db.get_collection("products", read_preference=CATALOG_READ_PREFERENCE)
+categories_collection = db.get_collection("categories", read_preference=CATALOG_READ_PREFERENCE)
 carts_collection = db.carts
 orders_collection = db.orders
 
+# For reads that must see a write just made, e.g. to refresh caches or compute count deltas
+products_primary = db.products
+categories_primary = db.categories
+
+# Index registry, applied idempotently at startup by ensure_indexes()
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        # Unique so registration can insert directly and rely on DuplicateKeyError
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "products": [
+        IndexModel([("created_at", ASCENDING), ("_id", ASCENDING)], name="created_at_id"),
+        IndexModel([("category", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)], name="category_created_at_id"),
+        # Equality on category first, then the sort key, so range filters on the sort key stay bounded
+        IndexModel([("current_price", ASCENDING), ("_id", ASCENDING)], name="current_price_id"),
+        IndexModel([("category", ASCENDING), ("current_price", ASCENDING), ("_id", ASCENDING)], name="category_current_price_id"),
+        IndexModel([("rating", DESCENDING), ("_id", DESCENDING)], name="rating_id"),
+        IndexModel([("category", ASCENDING), ("rating", DESCENDING), ("_id", DESCENDING)], name="category_rating_id"),
+        # Lets each worker pick up products other workers wrote since its last index sync
+        IndexModel([("updated_at", ASCENDING)], name="updated_at"),
+    ],
+    "categories": [
+        IndexModel([("slug", ASCENDING)], name="slug_unique", unique=True),
+    ],
+    "carts": [
+        IndexModel([("user_id", ASCENDING)], name="user_id_unique", unique=True),
+    ],
+    "orders": [
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_id_created_at"),
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at_id"),
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="status_created_at_id"),
+    ],
+}
+
+# Representative query shapes issued by the Database class, checked by check_indexes.py.
+# expect_scan marks queries that read a whole (small or bounded) collection on purpose.
+QUERY_SHAPES: List[Dict[str, Any]] = [
+    {"name": "get_user_by_email", "collection": "users", "filter": {"email": "user@example.com"}},
+    {"name": "get_user_by_id", "collection": "users", "filter": {"_id": "id"}},
+    {"name": "get_products", "collection": "products", "filter": {}, "sort": PRODUCT_SORT},
+    {"name": "get_products (category)", "collection": "products", "filter": {"category": "oyuncak"}, "sort": PRODUCT_SORT},
+    {"name": "get_products (price sort)", "collection": "products", "filter": {"current_price": {"$gte": 100, "$lte": 500}},
+     "sort": [("current_price", ASCENDING), ("_id", ASCENDING)]},
+    {"name": "get_products (category, price)", "collection": "products",
+     "filter": {"category": "oyuncak", "current_price": {"$lte": 500}}, "sort": [("current_price", DESCENDING), ("_id", DESCENDING)]},
+    {"name": "get_products (rating sort)", "collection": "products", "filter": {"rating": {"$gte": 4}},
+     "sort": [("rating", DESCENDING), ("_id", DESCENDING)]},
+    {"name": "get_products (category, rating)", "collection": "products", "filter": {"category": "oyuncak"},
+     "sort": [("rating", DESCENDING), ("_id", DESCENDING)]},
+    {"name": "get_products (search fallback)", "collection": "products", "expect_scan": True,
+     "filter": {"$or": [{"name": {"$regex": "robo", "$options": "i"}}, {"description": {"$regex": "robo", "$options": "i"}}]}},
+    {"name": "get_products_by_ids", "collection": "products", "filter": {"_id": {"$in": ["a", "b"]}}},
+    {"name": "rebuild_search_index", "collection": "products", "filter": {}, "expect_scan": True},
+    {"name": "sync_search_index", "collection": "products", "filter": {"updated_at": {"$gte": datetime(2024, 1, 1)}}},
+    {"name": "get_categories", "collection": "categories", "filter": {}, "expect_scan": True},
+    {"name": "get_cart", "collection": "carts", "filter": {"user_id": "id"}},
+    {"name": "get_orders_by_user", "collection": "orders", "filter": {"user_id": "id"}, "sort": [("created_at", DESCENDING)]},
+    {"name": "get_orders_page", "collection": "orders", "filter": {}, "sort": [("created_at", DESCENDING), ("_id", DESCENDING)]},
+    {"name": "get_orders_page (status)", "collection": "orders", "filter": {"status": "pending"},
+     "sort": [("created_at", DESCENDING), ("_id", DESCENDING)]},
+]
+
+def product_sort(sort: str = "default") -> List[tuple[str, int]]:
+    """Return the Mongo sort specification for a named listing sort"""
+    field, direction = PRODUCT_SORTS[sort]
+    return [(field, direction), ("_id", direction)]
+
+def _listing_fields(product: Any) -> ListingFields:
+    """Return the fields the search index filters and sorts by, from a product or product document"""
+    if isinstance(product, BaseModel):
+        return ListingFields(
+            product.category, product.current_price, product.rating, product.badge, product.in_stock, product.created_at
+        )
+    return ListingFields(
+        product.get("category", ""),
+        product.get("current_price", 0.0),
+        product.get("rating", 0),
+        product.get("badge"),
+        bool(product.get("in_stock", True)),
+        product.get("created_at") or datetime.min
+    )
+
+def _price_bucket(price: float) -> Any:
+    """Return the $bucket id of a price for PRICE_FACET_BOUNDARIES"""
+    position = bisect_right(PRICE_FACET_BOUNDARIES, price) - 1
+    if 0 <= position < len(PRICE_FACET_BOUNDARIES) - 1:
+        return PRICE_FACET_BOUNDARIES[position]
+    return "over"
+
+def projection_for(model: Type[BaseModel]) -> Optional[Dict[str, int]]:
+    """Return the Mongo projection that loads just the fields of a product model"""
+    if model is ProductInDB:
+        return None
+    return {field.alias or name: 1 for name, field in model.model_fields.items()}
+
+# Bumped on every product write so cached listings know to refresh
+_catalog_version = 0
+
+def catalog_version() -> int:
+    """Return a number that changes whenever products are written in this process"""
+    return _catalog_version
+
+def _catalog_changed():
+    """Mark cached product listings as stale"""
+    global _catalog_version
+    _catalog_version += 1
+
+def _product_saved(product: ProductInDB):
+    """Refresh in-process product state after a product was created or updated"""
+    _catalog_changed()
+    _count_cache.clear()
+    product_cache.set(product.id, product)
+    product_search_index.add(product.id, product.name, product.description, product.category, _listing_fields(product))
+    suggestion_index.add_product(product.id, product.name, product.category, product.rating)
+
+def _products_written(products: List[ProductInDB]):
+    """Refresh in-process product state after a bulk write, given the documents as stored"""
+    _catalog_changed()
+    _count_cache.clear()
+    for product in products:
+        # Cached rather than invalidated, so the next lookup cannot re-cache an older copy from a lagging secondary
+        product_cache.set(product.id, product)
+        product_search_index.add(product.id, product.name, product.description, product.category, _listing_fields(product))
+        suggestion_index.add_product(product.id, product.name, product.category, product.rating)
+
+def _stock_changed(product: ProductInDB):
+    """Refresh the cached product after a stock reservation or release"""
+    # Listings only go stale when availability flips; stock counts in them may lag by LISTING_CACHE_TTL
+    previous = product_cache.get(product.id)
+    if previous is None or previous.in_stock != product.in_stock:
+        _catalog_changed()
+    product_cache.set(product.id, product)
+    product_search_index.set_fields(product.id, _listing_fields(product))
+
+def _product_deleted(product_id: str):
+    """Drop in-process product state after a product was deleted"""
+    _catalog_changed()
+    _count_cache.clear()
+    product_cache.invalidate(product_id)
+    product_search_index.remove(product_id)
+    suggestion_index.remove_product(product_id)
+
+# Bumped on every category write so cached category listings know to refresh
+_category_version = 0
+
+def category_version() -> int:
+    """Return a number that changes whenever categories are written in this process"""
+    return _category_version
+
+def _categories_changed():
+    """Mark cached category listings as stale"""
+    global _category_version
+    _category_version += 1
+
+# Update pipeline stage mirroring ProductBase.sync_in_stock: tracked stock decides
+# in_stock, whatever the write set it to
+SYNC_IN_STOCK = {"$set": {"in_stock": {"$cond": [{"$isNumber": "$stock"}, {"$gt": ["$stock", 0]}, "$in_stock"]}}}
+
+def _set_fields_pipeline(fields: dict) -> List[dict]:
+    """Build an update pipeline that sets fields to literal values, then re-derives in_stock"""
+    return [{"$set": {field: {"$literal": value} for field, value in fields.items()}}, SYNC_IN_STOCK]
+
+# Fields whose change can move a product between category counts
+CATEGORY_COUNT_FIELDS = ("category", "in_stock", "stock")
+
+def _count_state(product: Any) -> tuple[str, bool]:
+    """Return the (category, in_stock) pair a product or product document contributes to category counts"""
+    if isinstance(product, BaseModel):
+        return product.category, product.in_stock
+    return product.get("category"), bool(product.get("in_stock", True))
+
+async def _adjust_category_counts(transitions: List[tuple[Optional[tuple[str, bool]], Optional[tuple[str, bool]]]]):
+    """Apply (before, after) product count states to the category documents with one bulk $inc.
+    
+    None stands for a product that did not exist before or no longer exists after.
+    """
+    deltas: Dict[str, Dict[str, int]] = {}
+    for before, after in transitions:
+        if before == after:
+            continue
+        for state, sign in ((before, -1), (after, 1)):
+            if state is None:
+                continue
+            category, in_stock = state
+            delta = deltas.setdefault(category, {"product_count": 0, "in_stock_count": 0})
+            delta["product_count"] += sign
+            if in_stock:
+                delta["in_stock_count"] += sign
+    
+    requests = [
+        UpdateOne({"slug": category}, {"$inc": {field: value for field, value in delta.items() if value}})
+        for category, delta in deltas.items()
+        if any(delta.values())
+    ]
+    if requests:
+        await categories_collection.bulk_write(requests, ordered=False)
+        _categories_changed()
+
 class Database:
     """Database operations class"""
     
@@ -46,9 +350,15 @@ class Database:
     @staticmethod
     async def get_user_by_id(user_id: str) -> Optional[UserInDB]:
         """Get user by ID"""
+        user = user_cache.get(user_id)
+        if user:
+            return user
+        
         user_doc = await users_collection.find_one({"_id": user_id})
         if user_doc:
-            return UserInDB(**user_doc)
+            user = UserInDB(**user_doc)
+            user_cache.set(user_id, user)
+            return user
         return None
     
     # Product operations
@@ -56,73 +366,705 @@ class Database:
     async def create_product(product: ProductInDB) -> ProductInDB:
         """Create a new product"""
         await products_collection.insert_one(product.dict(by_alias=True))
+        _product_saved(product)
+        await _adjust_category_counts([(None, _count_state(product))])
         return product
     
     @staticmethod
-    async def get_products(skip: int = 0, limit: int = 20, category: Optional[str] = None, search: Optional[str] = None) -> tuple[List[ProductInDB], int]:
-        """Get products with pagination and filtering"""
-        query = {}
+    def _filter_conditions(category: Optional[str] = None, filters: Optional[ProductFilters] = None) -> Dict[str, dict]:
+        """Build the Mongo condition of each listing filter, keyed by facet name"""
+        conditions = {}
         
         if category and category != "tum-urunler":
-            query["category"] = category
+            conditions["category"] = {"category": category}
+        
+        if filters:
+            price = {}
+            if filters.min_price is not None:
+                price["$gte"] = filters.min_price
+            if filters.max_price is not None:
+                price["$lte"] = filters.max_price
+            if price:
+                conditions["price"] = {"current_price": price}
+            if filters.min_rating is not None:
+                conditions["rating"] = {"rating": {"$gte": filters.min_rating}}
+            if filters.badge:
+                conditions["badge"] = {"badge": filters.badge}
+            if filters.in_stock is not None:
+                conditions["in_stock"] = {"in_stock": filters.in_stock}
+        
+        return conditions
+    
+    @staticmethod
+    def _search_query(search: str) -> dict:
+        """Regex search filter, only used until the search index is built; this scans the collection"""
+        pattern = re.escape(search)
+        return {
+            "$or": [
+                {"name": {"$regex": pattern, "$options": "i"}},
+                {"description": {"$regex": pattern, "$options": "i"}}
+            ]
+        }
+    
+    @staticmethod
+    def _products_query(
+        category: Optional[str] = None,
+        search: Optional[str] = None,
+        filters: Optional[ProductFilters] = None
+    ) -> dict:
+        """Build the Mongo filter for a product listing"""
+        query = {}
+        for condition in Database._filter_conditions(category, filters).values():
+            query.update(condition)
         
         if search:
-            query["$or"] = [
-                {"name": {"$regex": search, "$options": "i"}},
-                {"description": {"$regex": search, "$options": "i"}}
+            query.update(Database._search_query(search))
+        
+        return query
+    
+    @staticmethod
+    def _search_checks(
+        category: Optional[str] = None,
+        filters: Optional[ProductFilters] = None
+    ) -> Dict[str, Callable[[ListingFields], bool]]:
+        """Build the in-memory counterpart of each _filter_conditions condition, keyed by facet name"""
+        checks = {}
+        
+        if category and category != "tum-urunler":
+            checks["category"] = lambda fields: fields.category == category
+        
+        if filters:
+            min_price, max_price = filters.min_price, filters.max_price
+            if min_price is not None or max_price is not None:
+                checks["price"] = lambda fields: (
+                    (min_price is None or fields.current_price >= min_price)
+                    and (max_price is None or fields.current_price <= max_price)
+                )
+            if filters.min_rating is not None:
+                min_rating = filters.min_rating
+                checks["rating"] = lambda fields: fields.rating >= min_rating
+            if filters.badge:
+                badge = filters.badge
+                checks["badge"] = lambda fields: fields.badge == badge
+            if filters.in_stock is not None:
+                in_stock = filters.in_stock
+                checks["in_stock"] = lambda fields: fields.in_stock == in_stock
+        
+        return checks
+    
+    @staticmethod
+    def _search_product_ids(
+        search: str,
+        category: Optional[str] = None,
+        filters: Optional[ProductFilters] = None,
+        sort: str = "default"
+    ) -> List[str]:
+        """Rank search matches, then filter and sort them on the indexed listing fields without querying Mongo"""
+        key = (product_search_index.version, search, category, tuple(filters.dict().values()) if filters else None, sort)
+        product_ids = search_result_cache.get(key)
+        if product_ids is not None:
+            return product_ids
+        
+        if category or filters or sort != "default":
+            product_ids = Database._search_product_ids(search)
+        else:
+            product_ids = product_search_index.search(search)
+        
+        checks = list(Database._search_checks(category, filters).values())
+        fields = product_search_index.fields
+        if checks:
+            product_ids = [
+                product_id for product_id in product_ids
+                if all(check(fields[product_id]) for check in checks)
             ]
+        if sort != "default":
+            # Relevance order otherwise
+            field, direction = PRODUCT_SORTS[sort]
+            position = ListingFields._fields.index(field)
+            product_ids = sorted(
+                product_ids,
+                key=lambda product_id: (fields[product_id][position], product_id),
+                reverse=direction == DESCENDING
+            )
+        
+        search_result_cache.set(key, product_ids)
+        return product_ids
+    
+    @staticmethod
+    def _search_facets(
+        search: str,
+        category: Optional[str] = None,
+        filters: Optional[ProductFilters] = None
+    ) -> Dict[str, list]:
+        """Count search matches per category, price bucket and rating in memory, shaped like the $facet result"""
+        checks = Database._search_checks(category, filters)
+        fields = product_search_index.fields
+        # facet -> (filter it ignores, value of a product)
+        facet_values = {
+            "categories": ("category", lambda product: product.category),
+            "price": ("price", lambda product: _price_bucket(product.current_price)),
+            "rating": ("rating", lambda product: product.rating),
+        }
+        counts: Dict[str, Dict[Any, int]] = {facet: {} for facet in facet_values}
+        
+        for product_id in Database._search_product_ids(search):
+            product = fields[product_id]
+            failed = [name for name, check in checks.items() if not check(product)]
+            if len(failed) > 1:
+                continue
+            for facet, (own_filter, value) in facet_values.items():
+                if not failed or failed[0] == own_filter:
+                    bucket = value(product)
+                    counts[facet][bucket] = counts[facet].get(bucket, 0) + 1
+        
+        def by_count(facet: str) -> list:
+            return [
+                {"_id": value, "count": count}
+                for value, count in sorted(counts[facet].items(), key=lambda item: (-item[1], item[0]))
+            ]
+        
+        return {
+            "categories": by_count("categories"),
+            "price": [
+                {"_id": bucket, "count": counts["price"][bucket]}
+                for bucket in PRICE_FACET_BOUNDARIES[:-1] + ["over"] if bucket in counts["price"]
+            ],
+            "rating": by_count("rating"),
+        }
+    
+    @staticmethod
+    async def count_products(
+        category: Optional[str] = None,
+        search: Optional[str] = None,
+        exact: bool = False,
+        filters: Optional[ProductFilters] = None
+    ) -> int:
+        """Count matching products, from a short-lived cache unless exact is requested"""
+        if search and product_search_index.ready:
+            return len(Database._search_product_ids(search, category, filters))
+        
+        query = Database._products_query(category, search, filters)
+        key = repr(sorted(query.items()))
+        if not exact:
+            cached = _count_cache.get(key)
+            if cached is not None:
+                return cached
+        
+        if not query and not exact:
+            total_count = await products_collection.estimated_document_count()
+        else:
+            total_count = await products_collection.count_documents(query)
+        
+        _count_cache.set(key, total_count)
+        return total_count
+    
+    @staticmethod
+    def product_cursor(product: BaseModel, offset: int = 0, search: Optional[str] = None, sort: str = "default") -> str:
+        """Build the cursor that continues a listing after this product (at this offset for searches)"""
+        if search and product_search_index.ready:
+            return encode_cursor([offset])
+        field, _ = PRODUCT_SORTS[sort]
+        values = [getattr(product, field), product.id]
+        if sort != "default":
+            # Default-sort cursors keep their original two-value form
+            values.append(sort)
+        return encode_cursor(values)
+    
+    @staticmethod
+    async def get_products(
+        skip: int = 0,
+        limit: int = 20,
+        category: Optional[str] = None,
+        search: Optional[str] = None,
+        exact_count: bool = True,
+        model: Type[BaseModel] = ProductInDB,
+        filters: Optional[ProductFilters] = None,
+        sort: str = "default"
+    ) -> tuple[List[BaseModel], int]:
+        """Get products with pagination, filtering and sorting, loading only the fields of model"""
+        if search and product_search_index.ready:
+            # Rank in memory, then fetch only the requested page by id
+            ranked_ids = Database._search_product_ids(search, category, filters, sort)
+            page_ids = ranked_ids[skip:skip + limit]
+            found = await Database.get_products_by_ids(page_ids, model=model)
+            return [found[product_id] for product_id in page_ids if product_id in found], len(ranked_ids)
+        
+        query = Database._products_query(category, search, filters)
         
         # Get total count
-        total_count = await products_collection.count_documents(query)
+        total_count = await Database.count_products(category, search, exact=exact_count, filters=filters)
         
         # Get products
-        cursor = products_collection.find(query).skip(skip).limit(limit)
+        cursor = products_collection.find(query, projection_for(model)).sort(product_sort(sort)).skip(skip).limit(limit)
         products = []
         async for doc in cursor:
-            products.append(ProductInDB(**doc))
+            products.append(model(**doc))
         
         return products, total_count
     
+    @staticmethod
+    async def get_products_page(
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        category: Optional[str] = None,
+        search: Optional[str] = None,
+        model: Type[BaseModel] = ProductInDB,
+        filters: Optional[ProductFilters] = None,
+        sort: str = "default"
+    ) -> tuple[List[BaseModel], Optional[str]]:
+        """Get the page of products after a cursor and the cursor for the page after it"""
+        after = decode_cursor(cursor) if cursor else None
+        
+        if search and product_search_index.ready:
+            # Search results are ranked in memory, so the cursor is just an offset
+            if after is not None and (len(after) != 1 or not isinstance(after[0], int)):
+                raise ValueError("Invalid cursor")
+            offset = after[0] if after else 0
+            products, total_count = await Database.get_products(offset, limit, category, search, model=model, filters=filters, sort=sort)
+            next_cursor = encode_cursor([offset + limit]) if offset + limit < total_count else None
+            return products, next_cursor
+        
+        query = Database._products_query(category, search, filters)
+        if after is not None:
+            # Default-sort cursors carry no sort name
+            last_value, last_id = keyset_position(after, None if sort == "default" else sort)
+            field, direction = PRODUCT_SORTS[sort]
+            query = {"$and": [query, keyset_filter(field, direction, last_value, last_id)]}
+        
+        docs = products_collection.find(query, projection_for(model)).sort(product_sort(sort)).limit(limit + 1)
+        products = []
+        async for doc in docs:
+            products.append(model(**doc))
+        
+        next_cursor = None
+        if len(products) > limit:
+            products = products[:limit]
+            next_cursor = Database.product_cursor(products[-1], sort=sort)
+        return products, next_cursor
+    
+    @staticmethod
+    async def get_product_facets(
+        category: Optional[str] = None,
+        search: Optional[str] = None,
+        filters: Optional[ProductFilters] = None
+    ) -> Dict[str, list]:
+        """Count products per category, price bucket and rating with one $facet aggregation.
+        
+        Each facet applies every filter except its own, so the counts show what
+        choosing another value of that filter would return.
+        """
+        if search and product_search_index.ready:
+            facets = Database._search_facets(search, category, filters)
+        else:
+            conditions = Database._filter_conditions(category, filters)
+            
+            def match_except(facet: str) -> dict:
+                query = {}
+                for name, condition in conditions.items():
+                    if name != facet:
+                        query.update(condition)
+                return {"$match": query}
+            
+            pipeline = [
+                {"$match": Database._search_query(search) if search else {}},
+                {"$facet": {
+                    "categories": [match_except("category"), {"$sortByCount": "$category"}],
+                    "price": [
+                        match_except("price"),
+                        {"$bucket": {
+                            "groupBy": "$current_price",
+                            "boundaries": PRICE_FACET_BOUNDARIES,
+                            "default": "over"
+                        }}
+                    ],
+                    "rating": [match_except("rating"), {"$sortByCount": "$rating"}],
+                }}
+            ]
+            result = await products_collection.aggregate(pipeline).to_list(1)
+            facets = result[0] if result else {"categories": [], "price": [], "rating": []}
+        
+        upper_bounds = dict(zip(PRICE_FACET_BOUNDARIES, PRICE_FACET_BOUNDARIES[1:]))
+        price = []
+        for bucket in facets["price"]:
+            if bucket["_id"] == "over":
+                price.append({"min": PRICE_FACET_BOUNDARIES[-1], "max": None, "count": bucket["count"]})
+            else:
+                price.append({"min": bucket["_id"], "max": upper_bounds[bucket["_id"]], "count": bucket["count"]})
+        
+        return {
+            "categories": [{"value": bucket["_id"], "count": bucket["count"]} for bucket in facets["categories"]],
+            "price": price,
+            "rating": sorted(
+                ({"value": bucket["_id"], "count": bucket["count"]} for bucket in facets["rating"]),
+                key=lambda bucket: bucket["value"],
+                reverse=True
+            ),
+        }
+    
+    @staticmethod
+    async def create_products(products: List[ProductInDB]) -> List[ProductInDB]:
+        """Create many products with one unordered insert_many"""
+        if products:
+            await products_collection.insert_many([product.dict(by_alias=True) for product in products], ordered=False)
+            _products_written(products)
+            await _adjust_category_counts([(None, _count_state(product)) for product in products])
+        return products
+    
     @staticmethod
     async def get_product_by_id(product_id: str) -> Optional[ProductInDB]:
         """Get product by ID"""
+        product = product_cache.get(product_id)
+        if product:
+            return product
+        
         product_doc = await products_collection.find_one({"_id": product_id})
         if product_doc:
-            return ProductInDB(**product_doc)
+            product = ProductInDB(**product_doc)
+            product_cache.set(product_id, product)
+            return product
         return None
     
+    @staticmethod
+    async def get_products_by_ids(product_ids: List[str], model: Type[BaseModel] = ProductInDB) -> Dict[str, BaseModel]:
+        """Get many products in one query, keyed by ID, loading only the fields of model"""
+        products = {}
+        missing_ids = []
+        for product_id in dict.fromkeys(product_ids):
+            product = product_cache.get(product_id)
+            if product:
+                products[product_id] = product if model is ProductInDB else model(**product.dict(by_alias=True))
+            else:
+                missing_ids.append(product_id)
+        
+        if missing_ids:
+            async for doc in products_collection.find({"_id": {"$in": missing_ids}}, projection_for(model)):
+                product = model(**doc)
+                if model is ProductInDB:
+                    # Only complete documents go into the product cache
+                    product_cache.set(product.id, product)
+                products[product.id] = product
+        return products
+    
+    @staticmethod
+    async def get_products_for_checkout(product_ids: List[str]) -> Dict[str, ProductInDB]:
+        """Get many products keyed by ID straight from the primary, bypassing the product cache.
+        
+        Checkout prices and the stock-tracking decision must not come from a
+        cache entry or secondary that predates a price or stock change.
+        """
+        products = {}
+        async for doc in products_primary.find({"_id": {"$in": list(dict.fromkeys(product_ids))}}):
+            product = ProductInDB(**doc)
+            products[product.id] = product
+        return products
+    
     @staticmethod
     async def update_product(product_id: str, update_data: dict) -> Optional[ProductInDB]:
-        """Update product"""
+        """Update product, returning the updated document or None if it does not exist"""
         update_data["updated_at"] = datetime.utcnow()
-        result = await products_collection.update_one(
+        # The previous document is needed for category counts; the new one is derived from it,
+        # with the model validator applying the same in_stock rule as the pipeline
+        previous_doc = await products_collection.find_one_and_update(
             {"_id": product_id},
-            {"$set": update_data}
+            _set_fields_pipeline(update_data),
+            return_document=ReturnDocument.BEFORE
+        )
+        if previous_doc:
+            product = ProductInDB(**{**previous_doc, **update_data})
+            _product_saved(product)
+            await _adjust_category_counts([(_count_state(previous_doc), _count_state(product))])
+            return product
+        return None
+    
+    @staticmethod
+    async def bulk_update_products(patches: Dict[str, dict]) -> Dict[str, str]:
+        """Apply many product patches with one unordered bulk_write.
+        
+        Returns an outcome per product ID: "updated", "not_found" or the write error message.
+        """
+        if not patches:
+            return {}
+        
+        now = datetime.utcnow()
+        product_ids = list(patches)
+        requests = [
+            UpdateOne({"_id": product_id}, _set_fields_pipeline({**patches[product_id], "updated_at": now}))
+            for product_id in product_ids
+        ]
+        
+        previous = {}
+        if any(field in patch for patch in patches.values() for field in CATEGORY_COUNT_FIELDS):
+            async for doc in products_primary.find({"_id": {"$in": product_ids}}, {"category": 1, "in_stock": 1}):
+                previous[doc["_id"]] = _count_state(doc)
+        
+        outcomes = {}
+        try:
+            await products_collection.bulk_write(requests, ordered=False)
+        except BulkWriteError as exc:
+            for error in exc.details.get("writeErrors", []):
+                outcomes[product_ids[error["index"]]] = error.get("errmsg", "Write failed")
+        
+        # One read tells which products exist and refreshes every cache in a single pass
+        updated = []
+        async for doc in products_primary.find({"_id": {"$in": product_ids}}):
+            updated.append(ProductInDB(**doc))
+        for product in updated:
+            outcomes.setdefault(product.id, "updated")
+            _product_saved(product)
+        await _adjust_category_counts([
+            (previous[product.id], _count_state(product)) for product in updated if product.id in previous
+        ])
+        return {product_id: outcomes.get(product_id, "not_found") for product_id in product_ids}
+    
+    @staticmethod
+    async def upsert_products(products: List[ProductInDB]) -> List[str]:
+        """Insert or replace many products with one unordered bulk_write.
+        
+        Returns one outcome per product, in order: "inserted", "updated" or the write error message.
+        """
+        if not products:
+            return []
+        
+        now = datetime.utcnow()
+        requests = []
+        for product in products:
+            fields = product.dict(by_alias=True)
+            product_id = fields.pop("_id")
+            created_at = fields.pop("created_at")
+            fields["updated_at"] = now
+            requests.append(UpdateOne(
+                {"_id": product_id},
+                {"$set": fields, "$setOnInsert": {"created_at": created_at}},
+                upsert=True
+            ))
+        
+        previous = {}
+        async for doc in products_primary.find(
+            {"_id": {"$in": [product.id for product in products]}}, {"category": 1, "in_stock": 1}
+        ):
+            previous[doc["_id"]] = _count_state(doc)
+        
+        outcomes = ["updated"] * len(products)
+        try:
+            result = await products_collection.bulk_write(requests, ordered=False)
+            upserted = result.upserted_ids
+        except BulkWriteError as exc:
+            upserted = {item["index"]: item["_id"] for item in exc.details.get("upserted", [])}
+            for error in exc.details.get("writeErrors", []):
+                outcomes[error["index"]] = error.get("errmsg", "Write failed")
+        for index in upserted:
+            outcomes[index] = "inserted"
+        
+        # Read back from the primary: updated products keep their stored created_at
+        written_ids = [product.id for product, outcome in zip(products, outcomes) if outcome in ("inserted", "updated")]
+        written = []
+        if written_ids:
+            async for doc in products_primary.find({"_id": {"$in": written_ids}}):
+                written.append(ProductInDB(**doc))
+        _products_written(written)
+        await _adjust_category_counts([(previous.get(product.id), _count_state(product)) for product in written])
+        return outcomes
+    
+    @staticmethod
+    async def _apply_stock_change(product_id: str, delta: int, guard: dict) -> Optional[ProductInDB]:
+        """Add delta to a tracked stock level in one conditional write, keeping in_stock in step"""
+        now = datetime.utcnow()
+        # The stored previous state feeds the category counts; the new one is derived from it
+        previous_doc = await products_collection.find_one_and_update(
+            {"_id": product_id, "stock": guard},
+            [
+                {"$set": {"stock": {"$add": ["$stock", delta]}, "updated_at": now}},
+                SYNC_IN_STOCK,
+            ],
+            return_document=ReturnDocument.BEFORE
         )
-        if result.modified_count > 0:
-            return await Database.get_product_by_id(product_id)
+        if previous_doc:
+            product = ProductInDB(**{**previous_doc, "stock": previous_doc["stock"] + delta, "updated_at": now})
+            _stock_changed(product)
+            await _adjust_category_counts([(_count_state(previous_doc), _count_state(product))])
+            return product
         return None
     
+    @staticmethod
+    async def reserve_stock(product_id: str, quantity: int) -> Optional[ProductInDB]:
+        """Take quantity units of a product, or None if fewer are left or stock is not tracked"""
+        return await Database._apply_stock_change(product_id, -quantity, {"$gte": quantity})
+    
+    @staticmethod
+    async def release_stock(product_id: str, quantity: int) -> Optional[ProductInDB]:
+        """Put quantity units of a product back, e.g. after a failed or cancelled order"""
+        return await Database._apply_stock_change(product_id, quantity, {"$type": "number"})
+    
+    @staticmethod
+    async def reserve_stock_batch(quantities: Dict[str, int]) -> List[str]:
+        """Reserve every line of an order or none of them.
+        
+        Lines are reserved concurrently; if any fails or raises, the ones that
+        succeeded are released again. Returns the IDs of the products that could
+        not be reserved, or re-raises the first reservation error.
+        """
+        product_ids = list(quantities)
+        results = await asyncio.gather(*(
+            Database.reserve_stock(product_id, quantities[product_id]) for product_id in product_ids
+        ), return_exceptions=True)
+        errors = [result for result in results if isinstance(result, Exception)]
+        failed = [product_id for product_id, result in zip(product_ids, results) if not isinstance(result, ProductInDB)]
+        if failed:
+            await asyncio.gather(*(
+                Database.release_stock(product_id, quantities[product_id])
+                for product_id, result in zip(product_ids, results) if isinstance(result, ProductInDB)
+            ))
+        if errors:
+            raise errors[0]
+        return failed
+    
     @staticmethod
     async def delete_product(product_id: str) -> bool:
         """Delete product"""
-        result = await products_collection.delete_one({"_id": product_id})
-        return result.deleted_count > 0
+        product_doc = await products_collection.find_one_and_delete({"_id": product_id}, {"category": 1, "in_stock": 1})
+        _product_deleted(product_id)
+        if product_doc:
+            await _adjust_category_counts([(_count_state(product_doc), None)])
+        return product_doc is not None
+    
+    @staticmethod
+    async def rebuild_search_index():
+        """Load every product into the in-memory search and suggestion indexes"""
+        global _search_index_synced_at
+        started = datetime.utcnow()
+        cursor = products_primary.find({}, SEARCH_INDEX_PROJECTION)
+        rows = []
+        listing_fields = []
+        async for doc in cursor:
+            rows.append((doc["_id"], doc.get("name", ""), doc.get("description", ""), doc.get("category", ""), doc.get("rating", 0)))
+            listing_fields.append(_listing_fields(doc))
+        product_search_index.rebuild(row[:4] + (fields,) for row, fields in zip(rows, listing_fields))
+        
+        categories = [(category.slug, category.name) for category in await Database.get_categories()]
+        suggestion_index.rebuild(
+            ((product_id, name, category, rating) for product_id, name, _, category, rating in rows),
+            categories
+        )
+        _search_index_synced_at = started
+    
+    @staticmethod
+    async def sync_search_index() -> int:
+        """Apply product and category writes made by other workers to the in-memory search and suggestion indexes.
+        
+        Products updated since the last sync are re-indexed. When the product
+        count disagrees with the index, every ID is compared as well, which finds
+        deleted products and any write the updated_at window missed. Returns the
+        number of products that changed.
+        """
+        global _search_index_synced_at
+        if _search_index_synced_at is None:
+            return 0
+        started = datetime.utcnow()
+        
+        def reindex(doc: dict):
+            product_cache.invalidate(doc["_id"])
+            product_search_index.add(
+                doc["_id"], doc.get("name", ""), doc.get("description", ""), doc.get("category", ""), _listing_fields(doc)
+            )
+            suggestion_index.add_product(doc["_id"], doc.get("name", ""), doc.get("category", ""), doc.get("rating", 0))
+        
+        # Primary reads, so a lagging secondary cannot hide a write behind the new watermark
+        docs = [
+            doc async for doc in products_primary.find(
+                {"updated_at": {"$gte": _search_index_synced_at - SEARCH_INDEX_SYNC_OVERLAP}}, SEARCH_INDEX_PROJECTION
+            )
+        ]
+        for doc in docs:
+            reindex(doc)
+        
+        removed = []
+        if await products_primary.estimated_document_count() != len(product_search_index):
+            stored_ids = {doc["_id"] async for doc in products_primary.find({}, {"_id": 1})}
+            indexed_ids = set(product_search_index.product_ids())
+            removed = list(indexed_ids - stored_ids)
+            missing = list(stored_ids - indexed_ids)
+            # In slices, so the $in filters stay small
+            for position in range(0, len(missing), 1000):
+                async for doc in products_primary.find({"_id": {"$in": missing[position:position + 1000]}}, SEARCH_INDEX_PROJECTION):
+                    reindex(doc)
+                    docs.append(doc)
+        for product_id in removed:
+            product_cache.invalidate(product_id)
+            product_search_index.remove(product_id)
+            suggestion_index.remove_product(product_id)
+        # Categories are few; re-adding an unchanged one is a no-op
+        for category in await Database.get_categories(primary=True):
+            suggestion_index.add_category(category.slug, category.name)
+        
+        if docs or removed:
+            _catalog_changed()
+            _count_cache.clear()
+        
+        _search_index_synced_at = started
+        return len(docs) + len(removed)
     
     # Category operations
     @staticmethod
-    async def get_categories() -> List[CategoryInDB]:
-        """Get all categories"""
-        cursor = categories_collection.find({})
+    async def get_categories(primary: bool = False) -> List[CategoryInDB]:
+        """Get all categories, from the primary when the caller must see its own writes"""
+        cursor = (categories_primary if primary else categories_collection).find({})
         categories = []
         async for doc in cursor:
             categories.append(CategoryInDB(**doc))
         return categories
     
+    @staticmethod
+    async def create_categories(categories: List[CategoryInDB]) -> List[CategoryInDB]:
+        """Create many categories with one insert_many"""
+        if categories:
+            await categories_collection.insert_many([category.dict(by_alias=True) for category in categories])
+            _categories_changed()
+            for category in categories:
+                suggestion_index.add_category(category.slug, category.name)
+        return categories
+    
+    @staticmethod
+    async def sync_stock_flags() -> int:
+        """Re-derive in_stock on tracked products whose stored flag disagrees with their stock"""
+        result = await products_collection.update_many(
+            {"stock": {"$type": "number"}, "$expr": {"$ne": ["$in_stock", {"$gt": ["$stock", 0]}]}},
+            [SYNC_IN_STOCK]
+        )
+        return result.modified_count
+    
+    @staticmethod
+    async def recount_categories():
+        """Recompute every category's product counts with one aggregation.
+        
+        Counts are maintained incrementally by product writes; this corrects any
+        drift from writes that raced or bypassed the Database class.
+        """
+        counts = {}
+        async for row in products_primary.aggregate([
+            {"$group": {
+                "_id": "$category",
+                "product_count": {"$sum": 1},
+                "in_stock_count": {"$sum": {"$cond": [{"$ne": ["$in_stock", False]}, 1, 0]}}
+            }}
+        ]):
+            counts[row["_id"]] = {"product_count": row["product_count"], "in_stock_count": row["in_stock_count"]}
+        
+        requests = []
+        async for doc in categories_primary.find({}, {"slug": 1}):
+            requests.append(UpdateOne(
+                {"_id": doc["_id"]},
+                {"$set": counts.get(doc["slug"], {"product_count": 0, "in_stock_count": 0})}
+            ))
+        if requests:
+            await categories_collection.bulk_write(requests, ordered=False)
+        _categories_changed()
+    
     @staticmethod
     async def create_category(category: CategoryInDB) -> CategoryInDB:
         """Create a new category"""
         await categories_collection.insert_one(category.dict(by_alias=True))
+        _categories_changed()
+        suggestion_index.add_category(category.slug, category.name)
         return category
     
     # Cart operations
@@ -135,25 +1077,79 @@ class Database:
         return None
     
     @staticmethod
-    async def create_cart(cart: CartInDB) -> CartInDB:
-        """Create a new cart"""
-        await carts_collection.insert_one(cart.dict(by_alias=True))
-        return cart
+    async def get_or_create_cart(user_id: str) -> CartInDB:
+        """Get user cart, creating an empty one in the same round trip if needed"""
+        now = datetime.utcnow()
+        cart_doc = await carts_collection.find_one_and_update(
+            {"user_id": user_id},
+            {"$setOnInsert": {"_id": str(uuid.uuid4()), "items": [], "created_at": now, "updated_at": now}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return CartInDB(**cart_doc)
+    
+    @staticmethod
+    async def add_cart_item(user_id: str, product_id: str, quantity: int) -> CartInDB:
+        """Atomically add quantity of a product to the user cart"""
+        now = datetime.utcnow()
+        # Product already in the cart: bump its quantity in place
+        cart_doc = await carts_collection.find_one_and_update(
+            {"user_id": user_id, "items.product_id": product_id},
+            {"$inc": {"items.$.quantity": quantity}, "$set": {"updated_at": now}},
+            return_document=ReturnDocument.AFTER
+        )
+        if cart_doc:
+            return CartInDB(**cart_doc)
+        
+        # Otherwise append it, creating the cart if there is none yet
+        try:
+            cart_doc = await carts_collection.find_one_and_update(
+                {"user_id": user_id, "items.product_id": {"$ne": product_id}},
+                {
+                    "$push": {"items": {"product_id": product_id, "quantity": quantity}},
+                    "$set": {"updated_at": now},
+                    "$setOnInsert": {"_id": str(uuid.uuid4()), "created_at": now}
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # A concurrent request added the same product first; increment instead
+            return await Database.add_cart_item(user_id, product_id, quantity)
+        return CartInDB(**cart_doc)
     
     @staticmethod
-    async def update_cart(user_id: str, items: List[CartItem]) -> Optional[CartInDB]:
-        """Update cart items"""
+    async def set_cart_item_quantity(user_id: str, product_id: str, quantity: int) -> Optional[CartInDB]:
+        """Atomically set the quantity of a product already in the user cart"""
+        cart_doc = await carts_collection.find_one_and_update(
+            {"user_id": user_id, "items.product_id": product_id},
+            {"$set": {"items.$.quantity": quantity, "updated_at": datetime.utcnow()}},
+            return_document=ReturnDocument.AFTER
+        )
+        if cart_doc:
+            return CartInDB(**cart_doc)
+        return None
+    
+    @staticmethod
+    async def remove_cart_item(user_id: str, product_id: str) -> Optional[CartInDB]:
+        """Atomically remove a product from the user cart"""
+        cart_doc = await carts_collection.find_one_and_update(
+            {"user_id": user_id, "items.product_id": product_id},
+            {"$pull": {"items": {"product_id": product_id}}, "$set": {"updated_at": datetime.utcnow()}},
+            return_document=ReturnDocument.AFTER
+        )
+        if cart_doc:
+            return CartInDB(**cart_doc)
+        return None
+    
+    @staticmethod
+    async def clear_cart_items(user_id: str, product_ids: List[str]) -> bool:
+        """Atomically remove the given products from the user cart, leaving any others"""
         result = await carts_collection.update_one(
             {"user_id": user_id},
-            {
-                "$set": {
-                    "items": [item.dict() for item in items],
-                    "updated_at": datetime.utcnow()
-                }
-            },
-            upsert=True
+            {"$pull": {"items": {"product_id": {"$in": product_ids}}}, "$set": {"updated_at": datetime.utcnow()}}
         )
-        return await Database.get_cart(user_id)
+        return result.modified_count > 0
     
     # Order operations
     @staticmethod
@@ -180,46 +1176,105 @@ class Database:
         return None
     
     @staticmethod
-    async def get_all_orders() -> List[OrderInDB]:
-        """Get all orders (admin only)"""
-        cursor = orders_collection.find({}).sort("created_at", -1)
+    def _orders_query(
+        status: Optional[OrderStatus] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        cursor: Optional[str] = None
+    ) -> dict:
+        """Build the admin order filter, newest first after an optional cursor"""
+        query = {}
+        if status:
+            query["status"] = status.value
+        if created_from or created_to:
+            query["created_at"] = {}
+            if created_from:
+                query["created_at"]["$gte"] = created_from
+            if created_to:
+                query["created_at"]["$lt"] = created_to
+        if cursor:
+            last_created_at, last_id = keyset_position(decode_cursor(cursor))
+            query = {"$and": [query, keyset_filter("created_at", -1, last_created_at, last_id)]}
+        return query
+    
+    @staticmethod
+    async def get_orders_page(
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        status: Optional[OrderStatus] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None
+    ) -> tuple[List[OrderInDB], Optional[str]]:
+        """Get one page of orders (admin only) and the cursor for the next page"""
+        query = Database._orders_query(status, created_from, created_to, cursor)
+        docs = orders_collection.find(query).sort([("created_at", -1), ("_id", -1)]).limit(limit + 1)
         orders = []
-        async for doc in cursor:
+        async for doc in docs:
             orders.append(OrderInDB(**doc))
-        return orders
+        
+        next_cursor = None
+        if len(orders) > limit:
+            orders = orders[:limit]
+            next_cursor = encode_cursor([orders[-1].created_at, orders[-1].id])
+        return orders, next_cursor
+    
+    @staticmethod
+    def iter_orders(
+        cursor: Optional[str] = None,
+        status: Optional[OrderStatus] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        batch_size: int = 500
+    ) -> AsyncIterator[OrderInDB]:
+        """Iterate matching orders (admin only) newest first while the cursor is read"""
+        # Built eagerly so a bad cursor fails before any response is streamed
+        query = Database._orders_query(status, created_from, created_to, cursor)
+        docs = orders_collection.find(query, batch_size=batch_size).sort([("created_at", -1), ("_id", -1)])
+        return (OrderInDB(**doc) async for doc in docs)
+
+async def ensure_indexes() -> Dict[str, List[str]]:
+    """Create every registered index that is missing, returning the names per collection"""
+    created = {}
+    for collection_name, indexes in INDEXES.items():
+        created[collection_name] = []
+        for index in indexes:
+            try:
+                created[collection_name] += await db[collection_name].create_indexes([index])
+            except OperationFailure as exc:
+                # Usually duplicate data blocking a unique index; keep serving without it
+                logger.error("Could not create index %s on %s: %s", index.document["name"], collection_name, exc)
+    return created
+
+async def ping_database() -> Dict[str, Any]:
+    """Check that Mongo answers a ping within MONGO_PING_TIMEOUT seconds"""
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(client.admin.command("ping"), MONGO_PING_TIMEOUT)
+    except (asyncio.TimeoutError, PyMongoError) as exc:
+        return {"ok": False, "error": str(exc) or type(exc).__name__}
+    return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+async def sync_search_index_forever():
+    """Run Database.sync_search_index every SEARCH_INDEX_SYNC_INTERVAL seconds"""
+    if SEARCH_INDEX_SYNC_INTERVAL <= 0:
+        return
+    while True:
+        await asyncio.sleep(SEARCH_INDEX_SYNC_INTERVAL)
+        try:
+            changed = await Database.sync_search_index()
+        except PyMongoError as exc:
+            logger.warning("Search index sync failed: %s", exc)
+            continue
+        if changed:
+            logger.info("Search index sync applied %d product changes", changed)
 
 # Initialize default categories and products
 async def initialize_database():
     """Initialize database with default categories and products"""
-    # Check if categories exist
-    existing_categories = await Database.get_categories()
-    if not existing_categories:
-        default_categories = [
-            CategoryInDB(name="Tüm Ürünler", slug="tum-urunler", description="Tüm ürünler"),
-            CategoryInDB(name="Elektrikli Ev Aletleri", slug="elektrikli-ev-aletleri", description="Elektrikli ev aletleri"),
-            CategoryInDB(name="Spor Aletleri", slug="spor-aletleri", description="Spor ve fitness aletleri"),
-            CategoryInDB(name="Küçük Ev Aletleri", slug="kucuk-ev-aletleri", description="Küçük ev aletleri"),
-            CategoryInDB(name="Oyuncak", slug="oyuncak", description="Oyuncaklar"),
-        ]
-        
-        for category in default_categories:
-            await Database.create_category(category)
-    
-    # Check if products exist
-    products, total_count = await Database.get_products(limit=1)
-    if total_count == 0:
-        # Create default products based on mock data
-        from data.mockData import mockProducts
-        for mock_product in mockProducts:
-            product = ProductInDB(
-                name=mock_product["name"],
-                description=f"{mock_product['name']} - Yüksek kalite, garantili ürün. Hızlı kargo ile kapınızda!",
-                image=mock_product["image"],  # Use real image URL
-                original_price=mock_product["originalPrice"],
-                current_price=mock_product["currentPrice"],
-                rating=mock_product["rating"],
-                category=mock_product["category"],
-                badge=mock_product.get("badge"),
-                in_stock=True
-            )
-            await Database.create_product(product)
\ No newline at end of file
+    from seed import seed_defaults
+    await seed_defaults()
+    
+    # Repairs flags written before in_stock was derived in the database, ahead of the recount
+    await Database.sync_stock_flags()
+    await Database.recount_categories()
+    await Database.rebuild_search_index()
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Synthetic data generator for load and performance testing.
+
+Creates products, users, carts and orders with Turkish names, a skewed
+category mix, log-normal prices and popularity-skewed cart contents, written
+in insert_many batches so 100k-1M product catalogs build in minutes.
+
+Usage:
+    python generate_catalog.py --products 100000 --users 20000 --carts 5000 --orders 50000
+"""
+
+import asyncio
+import math
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import typer
+from dotenv import load_dotenv
+from pathlib import Path
+
+# Load environment variables
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+from database import (
+    db, ensure_indexes, products_collection, users_collection,
+    carts_collection, orders_collection
+)
+from models import OrderStatus, PaymentMethod, PaymentStatus, UserRole
+from auth import get_password_hash
+from seed import default_categories
+from pricing import calculate_shipping
+
+# Category share of the catalog, (median price, price spread) and product vocabulary
+CATEGORY_PROFILES = {
+    "elektrikli-ev-aletleri": {
+        "weight": 0.40,
+        "price": (2500.0, 0.7),
+        "types": ["Çamaşır Makinesi", "Bulaşık Makinesi", "Buzdolabı", "Klima", "Isıtıcı", "Yıkama Makinesi",
+                  "Süpürge", "Robot Süpürge", "Kurutma Makinesi", "Vantilatör", "Şofben", "Derin Dondurucu"],
+    },
+    "kucuk-ev-aletleri": {
+        "weight": 0.32,
+        "price": (900.0, 0.6),
+        "types": ["Air Fryer", "Kahve Makinesi", "Blender", "Tost Makinesi", "Su Isıtıcısı", "Ütü",
+                  "Saç Kurutma Makinesi", "Mikser", "Çay Makinesi", "Doğrayıcı", "Masaj Aleti", "Tartı"],
+    },
+    "spor-aletleri": {
+        "weight": 0.18,
+        "price": (1400.0, 0.8),
+        "types": ["Koşu Bandı", "Kondisyon Bisikleti", "Dambıl Seti", "Boks Padi", "Yoga Matı", "Barfiks Barı",
+                  "Eliptik Bisiklet", "Kürek Çekme Aleti", "Ağırlık Sehpası", "Atlama İpi"],
+    },
+    "oyuncak": {
+        "weight": 0.10,
+        "price": (450.0, 0.6),
+        "types": ["Uzaktan Kumandalı Araba", "Drone", "Lego Seti", "Peluş Ayı", "Yapboz", "Robot Kit",
+                  "Oyun Çadırı", "Akülü Araba", "Bebek", "Kutu Oyunu"],
+    },
+}
+
+BRANDS = ["robo", "Arçelik", "Vestel", "Beko", "Karaca", "Fakir", "Arzum", "Sinbo", "Kiwi", "Delta", "Voit", "Altus"]
+ADJECTIVES = ["Şarjlı", "Katlanır", "Taşınabilir", "Akıllı", "Dijital", "Kablosuz", "Sessiz", "Yüksek Basınçlı",
+              "Turbo", "Ultra", "Mini", "Pro", "Çok Fonksiyonlu", "Paslanmaz Çelik", "Uzaktan Kumandalı"]
+COLORS = ["Siyah", "Beyaz", "Gri", "Kırmızı", "Mavi", "Krem", "Mor", "Pembe", "Yeşil", "Gümüş"]
+FIRST_NAMES = ["Ahmet", "Mehmet", "Mustafa", "Ali", "Hüseyin", "Hasan", "İbrahim", "Murat", "Emre", "Burak",
+               "Ayşe", "Fatma", "Emine", "Hatice", "Zeynep", "Elif", "Merve", "Özlem", "Şeyma", "Gülşen"]
+LAST_NAMES = ["Yılmaz", "Kaya", "Demir", "Şahin", "Çelik", "Yıldız", "Yıldırım", "Öztürk", "Aydın", "Özdemir",
+              "Arslan", "Doğan", "Kılıç", "Aslan", "Çetin", "Kara", "Koç", "Kurt", "Özkan", "Şimşek"]
+CITIES = ["İstanbul", "Ankara", "İzmir", "Bursa", "Antalya", "Konya", "Adana", "Gaziantep", "Kocaeli", "Eskişehir"]
+IMAGES = [
+    "https://images.unsplash.com/photo-1484154218962-a197022b5858",
+    "https://images.unsplash.com/photo-1586208958839-06c17cacdf08",
+    "https://images.unsplash.com/photo-1570222094114-d054a817e56b",
+    "https://images.pexels.com/photos/213162/pexels-photo-213162.jpeg",
+    "https://images.pexels.com/photos/1370082/pexels-photo-1370082.jpeg",
+]
+ORDER_STATUS_WEIGHTS = {
+    OrderStatus.DELIVERED: 0.55, OrderStatus.SHIPPED: 0.15, OrderStatus.PAID: 0.12,
+    OrderStatus.PENDING: 0.10, OrderStatus.CANCELLED: 0.08,
+}
+
+# Product ids kept in memory for carts and orders; popular products come first
+PRODUCT_SAMPLE_SIZE = 50000
+
+def ascii_slug(text: str) -> str:
+    """Lowercase Turkish text into an ASCII e-mail safe token"""
+    table = str.maketrans("çğıöşüÇĞİÖŞÜ", "cgiosucgiosu")
+    return text.translate(table).lower()
+
+def random_created_at(rng: random.Random, now: datetime, days: int = 365) -> datetime:
+    """Pick a creation time in the last days, denser towards now"""
+    return now - timedelta(seconds=int(days * 86400 * rng.random() ** 2))
+
+def make_product(rng: random.Random, categories: List[str], weights: List[float], now: datetime) -> Dict:
+    """Build one product document matching ProductInDB"""
+    category = rng.choices(categories, weights)[0]
+    profile = CATEGORY_PROFILES[category]
+    brand = rng.choice(BRANDS)
+    name = f"{brand} {rng.choice(ADJECTIVES)} {rng.choice(profile['types'])}"
+    if rng.random() < 0.4:
+        name += f" {rng.choice(COLORS)}"
+
+    median, spread = profile["price"]
+    original_price = round(max(49.0, rng.lognormvariate(math.log(median), spread)), -1) - 1
+    badge = None
+    current_price = original_price
+    roll = rng.random()
+    if roll < 0.30:
+        discount = rng.choice([10, 15, 20, 25, 30, 40, 45, 50])
+        current_price = round(original_price * (100 - discount) / 100, 2)
+        badge = f"{discount}% İNDİRİM"
+    elif roll < 0.40:
+        badge = "YENİ"
+    elif roll < 0.45:
+        badge = "ÇOK SATAN"
+
+    stock = 0 if rng.random() < 0.05 else rng.randint(1, 500)
+    created_at = random_created_at(rng, now)
+    return {
+        "_id": str(uuid.uuid4()),
+        "name": name,
+        "description": f"{name} - Yüksek kalite, garantili ürün. Hızlı kargo ile kapınızda!",
+        "image": rng.choice(IMAGES),
+        "original_price": original_price,
+        "current_price": current_price,
+        "rating": rng.choices([1, 2, 3, 4, 5], [0.02, 0.03, 0.10, 0.30, 0.55])[0],
+        "category": category,
+        "badge": badge,
+        "in_stock": stock > 0,
+        "stock": stock,
+        "created_at": created_at,
+        "updated_at": created_at,
+    }
+
+def pick_product(rng: random.Random, sample: List[Dict]) -> Dict:
+    """Pick a product with a long-tail popularity skew"""
+    index = min(int(rng.paretovariate(1.2)) - 1, len(sample) - 1)
+    return sample[index] if rng.random() < 0.7 else rng.choice(sample)
+
+def make_items(rng: random.Random, sample: List[Dict]) -> List[Dict]:
+    """Build cart or order lines with distinct products"""
+    lines = {}
+    for _ in range(rng.choices([1, 2, 3, 4, 6, 10], [0.35, 0.25, 0.15, 0.12, 0.09, 0.04])[0]):
+        product = pick_product(rng, sample)
+        lines[product["_id"]] = {"product_id": product["_id"], "quantity": rng.choices([1, 2, 3], [0.8, 0.15, 0.05])[0]}
+    return list(lines.values())
+
+async def insert_batches(collection, make_document, count: int, batch_size: int, label: str):
+    """Insert count generated documents in unordered insert_many batches"""
+    written = 0
+    while written < count:
+        batch = [make_document(written + offset) for offset in range(min(batch_size, count - written))]
+        await collection.insert_many(batch, ordered=False)
+        written += len(batch)
+        typer.echo(f"{label}: {written}/{count}")
+
+async def generate(products: int, users: int, carts: int, orders: int, batch_size: int, seed: int, drop: bool):
+    """Generate and insert the synthetic data set"""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+
+    if drop:
+        for name in ("products", "categories", "users", "carts", "orders"):
+            await db.drop_collection(name)
+    await ensure_indexes()
+
+    if await db.categories.count_documents({}) == 0:
+        await db.categories.insert_many([category.dict(by_alias=True) for category in default_categories()])
+
+    categories = list(CATEGORY_PROFILES)
+    weights = [CATEGORY_PROFILES[category]["weight"] for category in categories]
+    sample: List[Dict] = []
+
+    def next_product(_: int) -> Dict:
+        product = make_product(rng, categories, weights, now)
+        if len(sample) < PRODUCT_SAMPLE_SIZE:
+            sample.append({"_id": product["_id"], "current_price": product["current_price"]})
+        return product
+
+    await insert_batches(products_collection, next_product, products, batch_size, "products")
+    if not sample:
+        async for doc in products_collection.find({}, {"current_price": 1}).limit(PRODUCT_SAMPLE_SIZE):
+            sample.append(doc)
+    if not sample and (carts or orders):
+        raise typer.BadParameter("carts and orders need at least one product")
+
+    # bcrypt is slow on purpose, so every generated user shares one hash of "password123"
+    hashed_password = get_password_hash("password123")
+    user_ids: List[str] = []
+    run_tag = uuid.uuid4().hex[:6]
+
+    def next_user(number: int) -> Dict:
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        created_at = random_created_at(rng, now, days=730)
+        user_id = str(uuid.uuid4())
+        if len(user_ids) < PRODUCT_SAMPLE_SIZE:
+            user_ids.append(user_id)
+        return {
+            "_id": user_id,
+            "name": f"{first} {last}",
+            "email": f"{ascii_slug(first)}.{ascii_slug(last)}.{run_tag}{number}@example.com",
+            "role": UserRole.USER.value,
+            "hashed_password": hashed_password,
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+    await insert_batches(users_collection, next_user, users, batch_size, "users")
+    if (carts or orders) and not user_ids:
+        raise typer.BadParameter("carts and orders need at least one generated user")
+
+    def next_cart(number: int) -> Dict:
+        updated_at = random_created_at(rng, now, days=30)
+        return {
+            "_id": str(uuid.uuid4()),
+            # One cart per user, as enforced by the unique carts.user_id index
+            "user_id": user_ids[number % len(user_ids)],
+            "items": make_items(rng, sample),
+            "created_at": updated_at,
+            "updated_at": updated_at,
+        }
+
+    await insert_batches(carts_collection, next_cart, min(carts, len(user_ids)), batch_size, "carts")
+
+    prices = {product["_id"]: product["current_price"] for product in sample}
+    statuses = list(ORDER_STATUS_WEIGHTS)
+    status_weights = list(ORDER_STATUS_WEIGHTS.values())
+
+    def next_order(_: int) -> Dict:
+        items = make_items(rng, sample)
+        total = round(sum(prices[item["product_id"]] * item["quantity"] for item in items), 2)
+        order_status = rng.choices(statuses, status_weights)[0]
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        created_at = random_created_at(rng, now)
+        return {
+            "_id": str(uuid.uuid4()),
+            "user_id": rng.choice(user_ids),
+            "items": items,
+            "total": total,
+            "shipping": calculate_shipping(total),
+            "status": order_status.value,
+            "shipping_address": {
+                "full_name": f"{first} {last}",
+                "phone": f"05{rng.randint(300000000, 599999999)}",
+                "address_line": f"{rng.choice(LAST_NAMES)} Sokak No:{rng.randint(1, 120)}",
+                "city": rng.choice(CITIES),
+                "postal_code": f"{rng.randint(1, 81):02d}{rng.randint(0, 999):03d}",
+                "country": "Turkey",
+            },
+            "payment_method": rng.choice(list(PaymentMethod)).value,
+            "payment_status": (
+                PaymentStatus.PENDING if order_status == OrderStatus.PENDING
+                else PaymentStatus.FAILED if order_status == OrderStatus.CANCELLED
+                else PaymentStatus.COMPLETED
+            ).value,
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+    await insert_batches(orders_collection, next_order, orders, batch_size, "orders")
+    typer.echo("Done. Restart the API so it rebuilds its in-memory search index.")
+
+def main(
+    products: int = typer.Option(10000, help="Products to create"),
+    users: int = typer.Option(1000, help="Users to create"),
+    carts: int = typer.Option(500, help="Carts to create, at most one per generated user"),
+    orders: int = typer.Option(5000, help="Orders to create"),
+    batch_size: int = typer.Option(5000, help="Documents per insert_many"),
+    seed: int = typer.Option(42, help="Random seed, for reproducible catalogs"),
+    drop: bool = typer.Option(False, help="Drop existing collections first"),
+):
+    """Generate a synthetic catalog with users, carts and orders."""
+    asyncio.run(generate(products, users, carts, orders, batch_size, seed, drop))
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,127 @@
+import gzip
+import hashlib
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request, Response, status
+
+try:
+    import brotli
+except ImportError:
+    # Optional: without it only gzip is offered
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+
+
+def make_etag(body: bytes) -> str:
+    """Build a strong ETag from a response body"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def version_etag(*parts) -> str:
+    """Build a weak ETag from values that identify a representation, such as an ID and updated_at"""
+    return 'W/"' + hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def _opaque_tag(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return "*" in candidates or _opaque_tag(etag) in {_opaque_tag(candidate) for candidate in candidates}
+
+
+def http_date(value: datetime) -> str:
+    """Format a naive UTC datetime for Last-Modified"""
+    return format_datetime(value.replace(tzinfo=timezone.utc), usegmt=True)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when no ETag was sent"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if last_modified is None or not if_modified_since:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # Last-Modified only has second precision
+    return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header, preferring br"""
+    accepted = set()
+    for value in (accept_encoding or "").split(","):
+        coding, *params = value.split(";")
+        quality = 1.0
+        for param in params:
+            name, _, param_value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(param_value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(coding.strip().lower())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a body with a content coding returned by choose_encoding"""
+    if encoding == "br":
+        # Quality 5 keeps most of br's gain at a fraction of the default CPU cost
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+def cacheable_response(
+    request: Request,
+    body: bytes,
+    etag: str,
+    cache_control: str,
+    last_modified: Optional[datetime] = None,
+    encoded_bodies: Optional[Dict[str, bytes]] = None
+) -> Response:
+    """Build a JSON response that honours conditional requests and Accept-Encoding.
+
+    encoded_bodies, when given, memoizes compressed variants of body so a cached
+    response is compressed only once per content coding.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    encoding = choose_encoding(request.headers.get("accept-encoding")) if len(body) >= COMPRESSION_MIN_SIZE else None
+    if encoding:
+        encoded = encoded_bodies.get(encoding) if encoded_bodies is not None else None
+        if encoded is None:
+            encoded = compress(body, encoding)
+            if encoded_bodies is not None:
+                encoded_bodies[encoding] = encoded
+        headers["Content-Encoding"] = encoding
+        body = encoded
+
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,322 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+# Latency buckets in seconds, from sub-millisecond cache hits to slow bulk writes
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text exposition format"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Labels, extra: str = "") -> str:
+    """Render a Prometheus label set"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value, keeping integers free of a trailing .0"""
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Monotonic counter per label set"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Labels = (), amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def values(self) -> Dict[Labels, float]:
+        """Return a snapshot of the value of every label set"""
+        with self._lock:
+            return dict(self._values)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}" for labels, value in values]
+
+
+class Gauge(Counter):
+    """Value that can go up and down per label set"""
+
+    kind = "gauge"
+
+    def dec(self, labels: Labels = (), amount: float = 1):
+        self.inc(labels, -amount)
+
+
+class Histogram:
+    """Fixed-bucket histogram per label set.
+
+    Observations only touch one bucket; the cumulative counts Prometheus expects
+    are built at scrape time.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._series: Dict[Labels, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Labels, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            snapshot = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+
+        lines = []
+        for labels, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                bucket_labels = _format_labels(self.labelnames, labels, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+http_requests_total = Counter(
+    "http_requests_total", "HTTP requests by route, method and status code", ("method", "route", "status")
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route and method", ("method", "route")
+)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served"
+)
+mongo_command_duration_seconds = Histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency by collection and command", ("collection", "command")
+)
+mongo_command_failures_total = Counter(
+    "mongo_command_failures_total", "Failed MongoDB commands by collection and command", ("collection", "command")
+)
+
+class CacheStat:
+    """One LRUCache counter of every registered cache, read at scrape time"""
+
+    labelnames = ("cache",)
+
+    def __init__(self, name: str, help_text: str, kind: str, stat: str):
+        self.name = name
+        self.help_text = help_text
+        self.kind = kind
+        self.stat = stat
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, (cache_name,))} {_format_value(cache.stats()[self.stat])}"
+            for cache_name, cache in list(CACHES.items())
+        ]
+
+
+# In-process LRU caches by name, reported on /api/metrics and /api/health
+CACHES: Dict[str, Any] = {}
+
+
+def register_cache(name: str, cache: Any):
+    """Report an LRUCache's size and hit/miss counters under name"""
+    CACHES[name] = cache
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Return the stats() of every registered cache"""
+    return {name: cache.stats() for name, cache in CACHES.items()}
+
+
+cache_hits_total = CacheStat("cache_hits_total", "In-process cache hits by cache", "counter", "hits")
+cache_misses_total = CacheStat("cache_misses_total", "In-process cache misses by cache", "counter", "misses")
+cache_evictions_total = CacheStat("cache_evictions_total", "In-process cache LRU evictions by cache", "counter", "evictions")
+cache_entries = CacheStat("cache_entries", "Entries held by each in-process cache", "gauge", "size")
+mongo_pool_connections = Gauge(
+    "mongo_pool_connections", "Open MongoDB connections by server", ("address",)
+)
+mongo_pool_checked_out = Gauge(
+    "mongo_pool_checked_out", "MongoDB connections currently checked out by server", ("address",)
+)
+mongo_pool_checkout_failures_total = Counter(
+    "mongo_pool_checkout_failures_total", "Failed MongoDB connection checkouts by server and reason", ("address", "reason")
+)
+
+METRICS = [
+    http_requests_total,
+    http_request_duration_seconds,
+    http_requests_in_flight,
+    mongo_command_duration_seconds,
+    mongo_command_failures_total,
+    mongo_pool_connections,
+    mongo_pool_checked_out,
+    mongo_pool_checkout_failures_total,
+    cache_hits_total,
+    cache_misses_total,
+    cache_evictions_total,
+    cache_entries,
+]
+
+
+def render_metrics() -> bytes:
+    """Render every metric in the Prometheus text exposition format"""
+    lines = []
+    for metric in METRICS:
+        lines.append(f"# HELP {metric.name} {metric.help_text}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing every HTTP request.
+
+    Requests are labelled with the matched route template rather than the raw
+    path, so product IDs and other path parameters do not multiply the series.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_flight.dec()
+            # The router stores the matched route on the scope
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            http_request_duration_seconds.observe((method, route_path), elapsed)
+            http_requests_total.inc((method, route_path, str(status_code)))
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every MongoDB command by collection and command name.
+
+    pymongo calls these hooks from Motor's worker threads, hence the locks in
+    the metric classes.
+    """
+
+    def __init__(self):
+        self._collections: Dict[Tuple[int, Optional[int]], str] = {}
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            target = event.command.get("collection")
+        key = (event.request_id, event.operation_id)
+        self._collections[key] = target if isinstance(target, str) else "none"
+
+    def succeeded(self, event):
+        collection = self._collections.pop((event.request_id, event.operation_id), "none")
+        mongo_command_duration_seconds.observe((collection, event.command_name), event.duration_micros / 1e6)
+
+    def failed(self, event):
+        collection = self._collections.pop((event.request_id, event.operation_id), "none")
+        mongo_command_duration_seconds.observe((collection, event.command_name), event.duration_micros / 1e6)
+        mongo_command_failures_total.inc((collection, event.command_name))
+
+
+def _address(event) -> str:
+    host, port = event.address
+    return f"{host}:{port}"
+
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """Tracks open and checked-out connections per server from pymongo's CMAP events"""
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        mongo_pool_connections.inc((_address(event),))
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        mongo_pool_connections.dec((_address(event),))
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        mongo_pool_checkout_failures_total.inc((_address(event), str(event.reason)))
+
+    def connection_checked_out(self, event):
+        mongo_pool_checked_out.inc((_address(event),))
+
+    def connection_checked_in(self, event):
+        mongo_pool_checked_out.dec((_address(event),))
+
+
+def mongo_pool_stats() -> Dict[str, Dict[str, float]]:
+    """Return open, checked-out and failed-checkout counts per MongoDB server"""
+    stats: Dict[str, Dict[str, float]] = {}
+
+    def server(address: str) -> Dict[str, float]:
+        return stats.setdefault(address, {"connections": 0, "checked_out": 0, "checkout_failures": 0})
+
+    for (address,), value in mongo_pool_connections.values().items():
+        server(address)["connections"] = value
+    for (address,), value in mongo_pool_checked_out.values().items():
+        server(address)["checked_out"] = value
+    for (address, _), value in mongo_pool_checkout_failures_total.values().items():
+        server(address)["checkout_failures"] += value
+    return stats
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, Field, EmailStr, model_validator
+from typing import Any, ClassVar, List, Optional
 from datetime import datetime
 from enum import Enum
 import uuid
@@ -65,12 +65,17 @@ class CategoryCreate(CategoryBase):
 
 class CategoryResponse(CategoryBase):
     id: str = Field(alias="_id")
+    product_count: int = 0
+    in_stock_count: int = 0
 
     class Config:
         populate_by_name = True
 
 class CategoryInDB(CategoryBase):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), alias="_id")
+    # Maintained by product writes in database.py, not set by clients
+    product_count: int = 0
+    in_stock_count: int = 0
 
     class Config:
         populate_by_name = True
@@ -86,20 +91,63 @@ class ProductBase(BaseModel):
     category: str
     badge: Optional[str] = None
     in_stock: bool = Field(default=True)
+    # Units on hand; None means stock is not tracked and in_stock is set by hand
+    stock: Optional[int] = Field(default=None, ge=0)
+
+    @model_validator(mode="after")
+    def sync_in_stock(self):
+        """Tracked stock decides whether the product is in stock"""
+        if self.stock is not None:
+            self.in_stock = self.stock > 0
+        return self
 
 class ProductCreate(ProductBase):
     pass
 
 class ProductUpdate(BaseModel):
-    name: Optional[str] = None
-    description: Optional[str] = None
+    # Same limits as ProductBase, so a patch cannot store a product that no longer validates
+    name: Optional[str] = Field(default=None, min_length=2, max_length=200)
+    description: Optional[str] = Field(default=None, max_length=1000)
     image: Optional[str] = None
-    original_price: Optional[float] = None
-    current_price: Optional[float] = None
-    rating: Optional[int] = None
+    original_price: Optional[float] = Field(default=None, gt=0)
+    current_price: Optional[float] = Field(default=None, gt=0)
+    rating: Optional[int] = Field(default=None, ge=1, le=5)
     category: Optional[str] = None
     badge: Optional[str] = None
+    # Ignored while the product tracks stock; in_stock then follows stock
     in_stock: Optional[bool] = None
+    stock: Optional[int] = Field(default=None, ge=0)
+
+class ProductPatch(ProductUpdate):
+    id: str
+
+    # An explicit null removes the badge or stops tracking stock; other fields need a value
+    nullable_fields: ClassVar[frozenset] = frozenset({"badge", "stock"})
+
+    @model_validator(mode="after")
+    def reject_nulls(self):
+        """Reject an explicit null for a field that cannot be cleared"""
+        cleared = sorted(
+            field for field in self.model_fields_set
+            if getattr(self, field) is None and field not in self.nullable_fields
+        )
+        if cleared:
+            raise ValueError(f"{', '.join(cleared)} cannot be null")
+        return self
+
+class BulkProductUpdateRequest(BaseModel):
+    products: List[ProductPatch] = Field(..., min_length=1, max_length=1000)
+
+class BulkProductUpdateResult(BaseModel):
+    id: str
+    status: str
+    error: Optional[str] = None
+
+class BulkProductUpdateResponse(BaseModel):
+    updated: int
+    not_found: int
+    failed: int
+    results: List[BulkProductUpdateResult]
 
 class ProductResponse(ProductBase):
     id: str = Field(alias="_id")
@@ -109,6 +157,23 @@ class ProductResponse(ProductBase):
     class Config:
         populate_by_name = True
 
+class ProductSummary(BaseModel):
+    """Fields a product grid needs, without the description"""
+    id: str = Field(alias="_id")
+    name: str
+    image: str
+    original_price: float
+    current_price: float
+    rating: int
+    category: str
+    badge: Optional[str] = None
+    in_stock: bool
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        populate_by_name = True
+
 class ProductInDB(ProductBase):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), alias="_id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -188,6 +253,12 @@ class OrderInDB(BaseModel):
     class Config:
         populate_by_name = True
 
+class CurrentUser(BaseModel):
+    """Identity carried in an access token"""
+    id: str
+    email: str
+    role: UserRole = UserRole.USER
+
 # Response Models
 class TokenResponse(BaseModel):
     access_token: str
@@ -197,8 +268,59 @@ class TokenResponse(BaseModel):
 class MessageResponse(BaseModel):
     message: str
 
+class OrderPageResponse(BaseModel):
+    orders: List[OrderResponse]
+    next_cursor: Optional[str] = None
+
+class ImportRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+class ProductImportResponse(BaseModel):
+    processed: int
+    inserted: int
+    updated: int
+    failed: int
+    errors: List[ImportRowError]
+    errors_truncated: bool = False
+
+class ProductBatchResponse(BaseModel):
+    products: List[ProductResponse]
+    missing: List[str]
+
+class Suggestion(BaseModel):
+    type: str
+    id: str
+    text: str
+    category: Optional[str] = None
+
+class ProductFilters(BaseModel):
+    """Listing filters beyond category and search"""
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    min_rating: Optional[int] = None
+    badge: Optional[str] = None
+    in_stock: Optional[bool] = None
+
+class FacetCount(BaseModel):
+    value: Any
+    count: int
+
+class PriceBucketCount(BaseModel):
+    min: float
+    max: Optional[float] = None
+    count: int
+
+class ProductFacets(BaseModel):
+    """Counts for each filter value, each ignoring its own filter but applying the others"""
+    categories: List[FacetCount]
+    price: List[PriceBucketCount]
+    rating: List[FacetCount]
+
 class ProductListResponse(BaseModel):
     products: List[ProductResponse]
     total_pages: int
     current_page: int
-    total_count: int
\ No newline at end of file
+    total_count: int
+    next_cursor: Optional[str] = None
+    facets: Optional[ProductFacets] = None
\ No newline at end of file
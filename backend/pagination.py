@@ -0,0 +1,56 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+
+def _encode_value(value: Any):
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+
+def _decode_value(obj: dict):
+    if set(obj) == {"$date"}:
+        return datetime.fromisoformat(obj["$date"])
+    return obj
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Pack the sort key values of the last returned row into an opaque cursor"""
+    raw = json.dumps(values, default=_encode_value, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Unpack a cursor produced by encode_cursor, raising ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()), object_hook=_decode_value)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def keyset_position(values: List[Any], sort: Optional[str] = None) -> Tuple[Any, str]:
+    """Return the (sort value, id) a decoded keyset cursor continues after.
+
+    Cursors of a named sort carry that name as a third value, so a cursor only
+    continues the sort it was issued for; anything else raises ValueError.
+    """
+    if len(values) < 2 or values[2:] != ([sort] if sort else []):
+        raise ValueError("Invalid cursor")
+    return values[0], values[1]
+
+
+def keyset_filter(field: str, direction: int, last_value: Any, last_id: str) -> dict:
+    """Build a query matching rows after (last_value, last_id) in (field, _id) order"""
+    op = "$gt" if direction > 0 else "$lt"
+    return {
+        "$or": [
+            {field: {op: last_value}},
+            {field: last_value, "_id": {op: last_id}}
+        ]
+    }
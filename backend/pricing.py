@@ -0,0 +1,8 @@
+# Orders above this total ship free, matching the storefront cart
+FREE_SHIPPING_THRESHOLD = 500.0
+SHIPPING_FEE = 29.90
+
+
+def calculate_shipping(total: float) -> float:
+    """Return the shipping fee for an order total"""
+    return 0.0 if total > FREE_SHIPPING_THRESHOLD else SHIPPING_FEE
@@ -0,0 +1,134 @@
+import codecs
+import csv
+import os
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import orjson
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+
+from database import Database
+from models import ProductCreate, ProductInDB, ProductImportResponse, ImportRowError
+
+# Rows validated and written per bulk_write
+IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE', '500'))
+# The error report is capped so a broken feed cannot grow the response without bound
+MAX_REPORTED_ERRORS = 1000
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> Optional[str]:
+    """Guess the import format from the upload's file name or content type"""
+    name = (filename or "").lower()
+    if name.endswith(".csv") or content_type == "text/csv":
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")) or content_type in ("application/x-ndjson", "application/jsonl"):
+        return "ndjson"
+    return None
+
+
+def iter_rows(file: BinaryIO, fmt: str) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """Yield (line number, row, parse error) from an uploaded file, one line at a time"""
+    lines = codecs.iterdecode(file, "utf-8-sig")
+
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            # Empty cells fall back to the model defaults
+            yield reader.line_num, {key.strip(): value for key, value in row.items() if key and value not in (None, "")}, None
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = orjson.loads(line)
+        except orjson.JSONDecodeError as exc:
+            yield line_number, None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, "Each line must be a JSON object"
+            continue
+        yield line_number, row, None
+
+
+def validate_row(row: Dict[str, Any]) -> ProductInDB:
+    """Turn an import row into a product, keeping its id when one is given"""
+    product_id = row.pop("id", None) or row.pop("_id", None)
+    product_data = ProductCreate(**row)
+    if product_id:
+        return ProductInDB(_id=str(product_id), **product_data.dict())
+    return ProductInDB(**product_data.dict())
+
+
+def parse_chunk(
+    rows: Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]],
+    size: int
+) -> List[Tuple[int, Optional[ProductInDB], List[str]]]:
+    """Read and validate up to size rows, returning (line number, product, errors) for each"""
+    parsed = []
+    for line_number, row, parse_error in rows:
+        if parse_error:
+            parsed.append((line_number, None, [parse_error]))
+        else:
+            try:
+                parsed.append((line_number, validate_row(row), []))
+            except ValidationError as exc:
+                parsed.append((line_number, None, [
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                    for error in exc.errors()
+                ]))
+        if len(parsed) >= size:
+            break
+    return parsed
+
+
+async def import_products(file: BinaryIO, fmt: str, chunk_size: int = IMPORT_CHUNK_SIZE) -> ProductImportResponse:
+    """Validate and upsert products from a CSV or NDJSON file in fixed-size chunks.
+
+    Reading, decoding and validation run in a worker thread one chunk at a time,
+    so only the bulk writes run on the event loop.
+    """
+    report = ProductImportResponse(processed=0, inserted=0, updated=0, failed=0, errors=[])
+
+    def record_error(line_number: int, errors: List[str]):
+        report.failed += 1
+        if len(report.errors) < MAX_REPORTED_ERRORS:
+            report.errors.append(ImportRowError(row=line_number, errors=errors))
+        else:
+            report.errors_truncated = True
+
+    async def flush(chunk: List[Tuple[int, ProductInDB]]):
+        outcomes = await Database.upsert_products([product for _, product in chunk])
+        for (line_number, _), outcome in zip(chunk, outcomes):
+            if outcome == "inserted":
+                report.inserted += 1
+            elif outcome == "updated":
+                report.updated += 1
+            else:
+                record_error(line_number, [outcome])
+
+    rows = iter_rows(file, fmt)
+    chunk: List[Tuple[int, ProductInDB]] = []
+    while True:
+        parsed = await run_in_threadpool(parse_chunk, rows, chunk_size)
+        if not parsed:
+            break
+
+        for line_number, product, errors in parsed:
+            report.processed += 1
+            if product is None:
+                record_error(line_number, errors)
+            else:
+                chunk.append((line_number, product))
+
+        # Rejected rows leave a chunk short, so it is topped up by the next read
+        while len(chunk) >= chunk_size:
+            await flush(chunk[:chunk_size])
+            chunk = chunk[chunk_size:]
+
+    if chunk:
+        await flush(chunk)
+
+    return report
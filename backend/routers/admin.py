@@ -1,10 +1,16 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Depends, Query, UploadFile, File
+from fastapi.responses import StreamingResponse, ORJSONResponse
+from typing import List, Optional, AsyncIterator, Literal
+from datetime import datetime
+import orjson
 from models import (
     ProductCreate, ProductUpdate, ProductResponse, ProductInDB,
-    OrderResponse, MessageResponse
+    OrderInDB, OrderPageResponse, OrderStatus, MessageResponse, ProductImportResponse,
+    BulkProductUpdateRequest, BulkProductUpdateResult, BulkProductUpdateResponse
 )
 from database import Database
+from serialization import order_content
+from product_import import import_products, detect_format
 from auth import get_current_admin_email
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -25,7 +31,8 @@ async def create_product(
         rating=product_data.rating,
         category=product_data.category,
         badge=product_data.badge,
-        in_stock=product_data.in_stock
+        in_stock=product_data.in_stock,
+        stock=product_data.stock
     )
     
     created_product = await Database.create_product(new_product)
@@ -41,10 +48,66 @@ async def create_product(
         category=created_product.category,
         badge=created_product.badge,
         in_stock=created_product.in_stock,
+        stock=created_product.stock,
         created_at=created_product.created_at,
         updated_at=created_product.updated_at
     )
 
+@router.post("/products/import", response_model=ProductImportResponse)
+async def import_products_file(
+    file: UploadFile = File(..., description="CSV with a header row, or NDJSON with one product per line"),
+    file_format: Optional[Literal["csv", "ndjson"]] = Query(None, alias="format", description="Defaults to the file extension"),
+    current_admin_email: str = Depends(get_current_admin_email)
+):
+    """Bulk import products from a CSV or NDJSON upload (Admin only)
+    
+    Rows are validated against ProductCreate and written in chunks with
+    unordered bulk upserts. Rows with an id replace that product.
+    """
+    fmt = file_format or detect_format(file.filename, file.content_type)
+    if not fmt:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Could not detect file format, pass format=csv or format=ndjson"
+        )
+    
+    try:
+        return await import_products(file.file, fmt)
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be UTF-8 encoded"
+        )
+    finally:
+        await file.close()
+
+@router.patch("/products/bulk", response_model=BulkProductUpdateResponse)
+async def bulk_update_products(
+    update_request: BulkProductUpdateRequest,
+    current_admin_email: str = Depends(get_current_admin_email)
+):
+    """Update many products in one batch, e.g. campaign prices and stock (Admin only)"""
+    patches = {}
+    for patch in update_request.products:
+        # Later patches for the same product win; only fields the patch sets are written, so null clears a badge
+        patches[patch.id] = patch.dict(exclude={"id"}, exclude_unset=True)
+    
+    outcomes = await Database.bulk_update_products(patches)
+    
+    results = []
+    for product_id, outcome in outcomes.items():
+        if outcome in ("updated", "not_found"):
+            results.append(BulkProductUpdateResult(id=product_id, status=outcome))
+        else:
+            results.append(BulkProductUpdateResult(id=product_id, status="failed", error=outcome))
+    
+    return BulkProductUpdateResponse(
+        updated=sum(1 for result in results if result.status == "updated"),
+        not_found=sum(1 for result in results if result.status == "not_found"),
+        failed=sum(1 for result in results if result.status == "failed"),
+        results=results
+    )
+
 @router.put("/products/{product_id}", response_model=ProductResponse)
 async def update_product(
     product_id: str,
@@ -52,22 +115,13 @@ async def update_product(
     current_admin_email: str = Depends(get_current_admin_email)
 ):
     """Update a product (Admin only)"""
-    # Check if product exists
-    existing_product = await Database.get_product_by_id(product_id)
-    if not existing_product:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Product not found"
-        )
-    
-    # Update product
     update_data = {k: v for k, v in product_data.dict().items() if v is not None}
     updated_product = await Database.update_product(product_id, update_data)
     
     if not updated_product:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Failed to update product"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found"
         )
     
     return ProductResponse(
@@ -81,6 +135,7 @@ async def update_product(
         category=updated_product.category,
         badge=updated_product.badge,
         in_stock=updated_product.in_stock,
+        stock=updated_product.stock,
         created_at=updated_product.created_at,
         updated_at=updated_product.updated_at
     )
@@ -101,49 +156,62 @@ async def delete_product(
     return MessageResponse(message="Product deleted successfully")
 
 # Order Management
-@router.get("/orders", response_model=List[OrderResponse])
-async def get_all_orders(current_admin_email: str = Depends(get_current_admin_email)):
-    """Get all orders (Admin only)"""
-    orders = await Database.get_all_orders()
+async def build_order_responses(orders: List[OrderInDB]) -> List[dict]:
+    """Build order response bodies, loading every referenced product in one query"""
+    products = await Database.get_products_by_ids(
+        [item.product_id for order in orders for item in order.items]
+    )
+    return [order_content(order, products) for order in orders]
+
+async def stream_orders(orders: AsyncIterator[OrderInDB], chunk_size: int = 100) -> AsyncIterator[bytes]:
+    """Yield orders as NDJSON lines, hydrating products one chunk at a time"""
+    chunk = []
+    async for order in orders:
+        chunk.append(order)
+        if len(chunk) >= chunk_size:
+            for order_response in await build_order_responses(chunk):
+                yield orjson.dumps(order_response, option=orjson.OPT_APPEND_NEWLINE)
+            chunk = []
     
-    order_responses = []
-    for order in orders:
-        # Build cart items with product details
-        cart_items = []
-        for item in order.items:
-            product = await Database.get_product_by_id(item.product_id)
-            if product:
-                cart_items.append({
-                    "product_id": item.product_id,
-                    "product": ProductResponse(
-                        _id=product.id,
-                        name=product.name,
-                        description=product.description,
-                        image=product.image,
-                        original_price=product.original_price,
-                        current_price=product.current_price,
-                        rating=product.rating,
-                        category=product.category,
-                        badge=product.badge,
-                        in_stock=product.in_stock,
-                        created_at=product.created_at,
-                        updated_at=product.updated_at
-                    ),
-                    "quantity": item.quantity
-                })
+    if chunk:
+        for order_response in await build_order_responses(chunk):
+            yield orjson.dumps(order_response, option=orjson.OPT_APPEND_NEWLINE)
+
+@router.get("/orders", response_model=OrderPageResponse)
+async def get_all_orders(
+    limit: int = Query(50, ge=1, le=200, description="Orders per page"),
+    cursor: Optional[str] = Query(None, description="Cursor returned by the previous page"),
+    order_status: Optional[OrderStatus] = Query(None, alias="status", description="Filter by order status"),
+    date_from: Optional[datetime] = Query(None, description="Only orders created at or after this time"),
+    date_to: Optional[datetime] = Query(None, description="Only orders created before this time"),
+    stream: bool = Query(False, description="Stream every matching order as NDJSON"),
+    current_admin_email: str = Depends(get_current_admin_email)
+):
+    """Get orders page by page, or stream them as NDJSON (Admin only)"""
+    try:
+        if stream:
+            orders = Database.iter_orders(
+                cursor=cursor,
+                status=order_status,
+                created_from=date_from,
+                created_to=date_to
+            )
+            return StreamingResponse(stream_orders(orders), media_type="application/x-ndjson")
         
-        order_responses.append(OrderResponse(
-            _id=order.id,
-            user_id=order.user_id,
-            items=cart_items,
-            total=order.total,
-            shipping=order.shipping,
-            status=order.status,
-            shipping_address=order.shipping_address,
-            payment_method=order.payment_method,
-            payment_status=order.payment_status,
-            created_at=order.created_at,
-            updated_at=order.updated_at
-        ))
+        orders, next_cursor = await Database.get_orders_page(
+            limit=limit,
+            cursor=cursor,
+            status=order_status,
+            created_from=date_from,
+            created_to=date_to
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
     
-    return order_responses
\ No newline at end of file
+    return ORJSONResponse({
+        "orders": await build_order_responses(orders),
+        "next_cursor": next_cursor
+    })
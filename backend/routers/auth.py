@@ -1,12 +1,13 @@
 from fastapi import APIRouter, HTTPException, status, Depends
+from pymongo.errors import DuplicateKeyError
 from datetime import timedelta
-from models import UserCreate, UserLogin, UserResponse, UserInDB, TokenResponse, UserRole
+from models import UserCreate, UserLogin, UserResponse, UserInDB, TokenResponse, UserRole, CurrentUser
 from database import Database
 from auth import (
-    verify_password, 
-    get_password_hash, 
+    verify_password_async,
+    get_password_hash_async,
     create_access_token, 
-    get_current_user_email,
+    get_current_user,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
 
@@ -15,16 +16,8 @@ router = APIRouter(prefix="/auth", tags=["authentication"])
 @router.post("/register", response_model=TokenResponse)
 async def register(user_data: UserCreate):
     """Register a new user"""
-    # Check if user already exists
-    existing_user = await Database.get_user_by_email(user_data.email)
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-    
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     new_user = UserInDB(
         name=user_data.name,
         email=user_data.email,
@@ -32,14 +25,22 @@ async def register(user_data: UserCreate):
         hashed_password=hashed_password
     )
     
-    # Save to database
-    created_user = await Database.create_user(new_user)
+    # Save to database; the unique email index rejects existing users
+    try:
+        created_user = await Database.create_user(new_user)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
     
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={
             "sub": created_user.email,
+            "uid": created_user.id,
+            "role": created_user.role.value,
             "is_admin": created_user.role == UserRole.ADMIN
         },
         expires_delta=access_token_expires
@@ -66,7 +67,7 @@ async def login(user_credentials: UserLogin):
     """Login user"""
     # Get user from database
     user = await Database.get_user_by_email(user_credentials.email)
-    if not user or not verify_password(user_credentials.password, user.hashed_password):
+    if not user or not await verify_password_async(user_credentials.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -78,6 +79,8 @@ async def login(user_credentials: UserLogin):
     access_token = create_access_token(
         data={
             "sub": user.email,
+            "uid": user.id,
+            "role": user.role.value,
             "is_admin": user.role == UserRole.ADMIN
         },
         expires_delta=access_token_expires
@@ -100,9 +103,9 @@ async def login(user_credentials: UserLogin):
     )
 
 @router.get("/profile", response_model=UserResponse)
-async def get_profile(current_user_email: str = Depends(get_current_user_email)):
+async def get_profile(current_user: CurrentUser = Depends(get_current_user)):
     """Get current user profile"""
-    user = await Database.get_user_by_email(current_user_email)
+    user = await Database.get_user_by_id(current_user.id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
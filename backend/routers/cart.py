@@ -1,76 +1,36 @@
 from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
-from models import CartItem, CartResponse, CartItemResponse, ProductResponse, MessageResponse, CartInDB
+from fastapi.responses import ORJSONResponse
+from models import CartItem, CartResponse, CartInDB, CurrentUser
 from database import Database
-from auth import get_current_user_email
+from serialization import cart_items_content
+from auth import get_current_user
 
 router = APIRouter(prefix="/cart", tags=["cart"])
 
-async def build_cart_response(cart: CartInDB) -> CartResponse:
-    """Build cart response with product details"""
-    cart_items = []
-    total = 0.0
+async def build_cart_response(cart: CartInDB) -> dict:
+    """Build cart response body with product details"""
+    products = await Database.get_products_by_ids([item.product_id for item in cart.items])
+    available = {product_id: product for product_id, product in products.items() if product.in_stock}
     
+    total = 0.0
     for item in cart.items:
-        product = await Database.get_product_by_id(item.product_id)
-        if product and product.in_stock:
-            product_response = ProductResponse(
-                _id=product.id,
-                name=product.name,
-                description=product.description,
-                image=product.image,
-                original_price=product.original_price,
-                current_price=product.current_price,
-                rating=product.rating,
-                category=product.category,
-                badge=product.badge,
-                in_stock=product.in_stock,
-                created_at=product.created_at,
-                updated_at=product.updated_at
-            )
-            
-            cart_item_response = CartItemResponse(
-                product_id=item.product_id,
-                product=product_response,
-                quantity=item.quantity
-            )
-            
-            cart_items.append(cart_item_response)
-            total += product.current_price * item.quantity
+        if item.product_id in available:
+            total += available[item.product_id].current_price * item.quantity
     
-    return CartResponse(items=cart_items, total=total)
+    return {"items": cart_items_content(cart.items, available), "total": total}
 
 @router.get("/", response_model=CartResponse)
-async def get_cart(current_user_email: str = Depends(get_current_user_email)):
+async def get_cart(current_user: CurrentUser = Depends(get_current_user)):
     """Get user cart"""
-    user = await Database.get_user_by_email(current_user_email)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
-    cart = await Database.get_cart(user.id)
-    if not cart:
-        # Create empty cart
-        cart = CartInDB(user_id=user.id, items=[])
-        await Database.create_cart(cart)
-    
-    return await build_cart_response(cart)
+    cart = await Database.get_or_create_cart(current_user.id)
+    return ORJSONResponse(await build_cart_response(cart))
 
 @router.post("/add")
 async def add_to_cart(
     item: CartItem,
-    current_user_email: str = Depends(get_current_user_email)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """Add item to cart"""
-    user = await Database.get_user_by_email(current_user_email)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
     # Verify product exists
     product = await Database.get_product_by_id(item.product_id)
     if not product:
@@ -85,122 +45,56 @@ async def add_to_cart(
             detail="Product is out of stock"
         )
     
-    # Get current cart
-    cart = await Database.get_cart(user.id)
-    if not cart:
-        cart = CartInDB(user_id=user.id, items=[])
-    
-    # Update cart items
-    existing_item = None
-    for cart_item in cart.items:
-        if cart_item.product_id == item.product_id:
-            existing_item = cart_item
-            break
-    
-    if existing_item:
-        existing_item.quantity += item.quantity
-    else:
-        cart.items.append(item)
-    
-    # Save updated cart
-    await Database.update_cart(user.id, cart.items)
+    # Add to cart atomically
+    updated_cart = await Database.add_cart_item(current_user.id, item.product_id, item.quantity)
     
     # Build response
-    updated_cart = await Database.get_cart(user.id)
     cart_response = await build_cart_response(updated_cart)
     
-    return {
+    return ORJSONResponse({
         "message": "Item added to cart",
         "cart": cart_response
-    }
+    })
 
 @router.put("/update")
 async def update_cart_item(
     item: CartItem,
-    current_user_email: str = Depends(get_current_user_email)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """Update cart item quantity"""
-    user = await Database.get_user_by_email(current_user_email)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
-    cart = await Database.get_cart(user.id)
-    if not cart:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Cart not found"
-        )
-    
-    # Update item quantity
-    item_found = False
-    for cart_item in cart.items:
-        if cart_item.product_id == item.product_id:
-            cart_item.quantity = item.quantity
-            item_found = True
-            break
-    
-    if not item_found:
+    # Quantity is validated to be at least 1, so this never empties a line
+    updated_cart = await Database.set_cart_item_quantity(current_user.id, item.product_id, item.quantity)
+    if not updated_cart:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Item not found in cart"
         )
     
-    # Remove items with quantity 0
-    cart.items = [item for item in cart.items if item.quantity > 0]
-    
-    # Save updated cart
-    await Database.update_cart(user.id, cart.items)
-    
     # Build response
-    updated_cart = await Database.get_cart(user.id)
     cart_response = await build_cart_response(updated_cart)
     
-    return {
+    return ORJSONResponse({
         "message": "Cart updated",
         "cart": cart_response
-    }
+    })
 
 @router.delete("/remove", response_model=dict)
 async def remove_from_cart(
     product_id: str,
-    current_user_email: str = Depends(get_current_user_email)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """Remove item from cart"""
-    user = await Database.get_user_by_email(current_user_email)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
-    cart = await Database.get_cart(user.id)
-    if not cart:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Cart not found"
-        )
-    
-    # Remove item
-    original_length = len(cart.items)
-    cart.items = [item for item in cart.items if item.product_id != product_id]
-    
-    if len(cart.items) == original_length:
+    updated_cart = await Database.remove_cart_item(current_user.id, product_id)
+    if not updated_cart:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Item not found in cart"
         )
     
-    # Save updated cart
-    await Database.update_cart(user.id, cart.items)
-    
     # Build response
-    updated_cart = await Database.get_cart(user.id)
     cart_response = await build_cart_response(updated_cart)
     
-    return {
+    return ORJSONResponse({
         "message": "Item removed from cart",
         "cart": cart_response
-    }
\ No newline at end of file
+    })
\ No newline at end of file
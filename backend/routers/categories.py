@@ -1,21 +1,65 @@
-from fastapi import APIRouter
-from typing import List
+from fastapi import APIRouter, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from typing import List, Optional
 from models import CategoryResponse
-from database import Database
+from database import Database, category_version
+from http_cache import make_etag, etag_matches
+import json
+import os
+import time
 
 router = APIRouter(prefix="/categories", tags=["categories"])
 
-@router.get("/", response_model=List[CategoryResponse])
-async def get_categories():
-    """Get all categories"""
-    categories = await Database.get_categories()
-    
-    return [
+# Other workers may write categories too, so the snapshot is also rebuilt periodically
+CATEGORY_SNAPSHOT_TTL = float(os.environ.get("CATEGORY_SNAPSHOT_TTL", "60"))
+CATEGORY_CACHE_CONTROL = os.environ.get("CATEGORY_CACHE_CONTROL", "no-cache")
+ALL_PRODUCTS_SLUG = "tum-urunler"
+
+# (category version, expiry, body, etag)
+_snapshot: Optional[tuple[int, float, bytes, str]] = None
+
+async def get_category_snapshot() -> tuple[bytes, str]:
+    """Return the serialized category list and its ETag, rebuilding it when stale"""
+    global _snapshot
+    version = category_version()
+    if _snapshot and _snapshot[0] == version and _snapshot[1] > time.monotonic():
+        return _snapshot[2], _snapshot[3]
+
+    # Rebuilt after category count changes, so read from the primary to pick them up
+    categories = await Database.get_categories(primary=True)
+    # The "all products" entry has no products of its own, so it shows the catalog total
+    totals = {
+        "product_count": sum(category.product_count for category in categories if category.slug != ALL_PRODUCTS_SLUG),
+        "in_stock_count": sum(category.in_stock_count for category in categories if category.slug != ALL_PRODUCTS_SLUG),
+    }
+    category_responses = [
         CategoryResponse(
             _id=category.id,
             name=category.name,
             slug=category.slug,
-            description=category.description
+            description=category.description,
+            product_count=totals["product_count"] if category.slug == ALL_PRODUCTS_SLUG else category.product_count,
+            in_stock_count=totals["in_stock_count"] if category.slug == ALL_PRODUCTS_SLUG else category.in_stock_count
         )
         for category in categories
-    ]
\ No newline at end of file
+    ]
+    body = json.dumps(
+        jsonable_encoder(category_responses),
+        ensure_ascii=False,
+        separators=(",", ":")
+    ).encode("utf-8")
+    etag = make_etag(body)
+
+    _snapshot = (version, time.monotonic() + CATEGORY_SNAPSHOT_TTL, body, etag)
+    return body, etag
+
+@router.get("/", response_model=List[CategoryResponse])
+async def get_categories(request: Request):
+    """Get all categories with their product counts"""
+    body, etag = await get_category_snapshot()
+    headers = {"ETag": etag, "Cache-Control": CATEGORY_CACHE_CONTROL}
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,109 @@
+from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi.responses import ORJSONResponse
+from typing import List
+import asyncio
+import logging
+from models import OrderCreate, OrderInDB, OrderResponse, CartItem, CurrentUser, UserRole
+from database import Database
+from serialization import order_content
+from pricing import calculate_shipping
+from auth import get_current_user
+
+router = APIRouter(prefix="/orders", tags=["orders"])
+logger = logging.getLogger(__name__)
+
+@router.post("/", response_model=OrderResponse)
+async def create_order(
+    order_data: OrderCreate,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Place an order; prices, totals and shipping are computed server-side"""
+    # Merge repeated lines so each product is priced and reserved once
+    quantities = {}
+    for item in order_data.items:
+        quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+    
+    if not quantities:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Order has no items"
+        )
+    
+    # Price every line with one uncached primary read, so a just-changed price is charged
+    products = await Database.get_products_for_checkout(list(quantities))
+    # Tracked stock is checked by the reservation itself, not by a possibly stale read
+    unavailable = [
+        product_id for product_id in quantities
+        if product_id not in products
+        or (products[product_id].stock is None and not products[product_id].in_stock)
+    ]
+    if unavailable:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"message": "Some products are unavailable", "product_ids": unavailable}
+        )
+    
+    items = [CartItem(product_id=product_id, quantity=quantity) for product_id, quantity in quantities.items()]
+    total = round(sum(products[item.product_id].current_price * item.quantity for item in items), 2)
+    
+    order = OrderInDB(
+        user_id=current_user.id,
+        items=items,
+        total=total,
+        shipping=calculate_shipping(total),
+        shipping_address=order_data.shipping_address,
+        payment_method=order_data.payment_method
+    )
+    
+    tracked = {
+        product_id: quantity for product_id, quantity in quantities.items()
+        if products[product_id].stock is not None
+    }
+    out_of_stock = await Database.reserve_stock_batch(tracked)
+    if out_of_stock:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": "Not enough stock", "product_ids": out_of_stock}
+        )
+    
+    try:
+        await Database.create_order(order)
+    except Exception:
+        await asyncio.gather(*(
+            Database.release_stock(product_id, quantity) for product_id, quantity in tracked.items()
+        ))
+        raise
+    
+    # Only once the order exists, so a failed insert leaves the cart intact
+    try:
+        await Database.clear_cart_items(current_user.id, list(quantities))
+    except Exception as exc:
+        # The order stands; leftover cart lines are harmless
+        logger.warning("Could not clear cart of user %s after order %s: %s", current_user.id, order.id, exc)
+    
+    return ORJSONResponse(order_content(order, products))
+
+@router.get("/", response_model=List[OrderResponse])
+async def get_my_orders(current_user: CurrentUser = Depends(get_current_user)):
+    """Get the current user's orders, newest first"""
+    orders = await Database.get_orders_by_user(current_user.id)
+    products = await Database.get_products_by_ids(
+        [item.product_id for order in orders for item in order.items]
+    )
+    return ORJSONResponse([order_content(order, products) for order in orders])
+
+@router.get("/{order_id}", response_model=OrderResponse)
+async def get_order(
+    order_id: str,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Get one of the current user's orders"""
+    order = await Database.get_order_by_id(order_id)
+    if not order or (order.user_id != current_user.id and current_user.role != UserRole.ADMIN):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Order not found"
+        )
+    
+    products = await Database.get_products_by_ids([item.product_id for item in order.items])
+    return ORJSONResponse(order_content(order, products))
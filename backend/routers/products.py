@@ -1,58 +1,183 @@
-from fastapi import APIRouter, HTTPException, status, Query, Depends
-from typing import Optional
-from models import ProductResponse, ProductListResponse, ProductCreate, ProductUpdate
-from database import Database
+from fastapi import APIRouter, HTTPException, status, Query, Depends, Request
+from fastapi.responses import ORJSONResponse
+from typing import List, Optional, Literal, Type
+from pydantic import BaseModel
+from models import ProductResponse, ProductListResponse, ProductSummary, ProductInDB, ProductCreate, ProductUpdate, ProductFilters, Suggestion, ProductBatchResponse
+from database import Database, catalog_version
+from serialization import product_payload, product_fragment, product_list_content
+from http_cache import make_etag, version_etag, cacheable_response
+from cache import LRUCache
+from metrics import register_cache
+from search import suggestion_index
 from auth import get_current_admin_email
+import asyncio
 import math
+import orjson
+import os
 
 router = APIRouter(prefix="/products", tags=["products"])
 
-@router.get("/", response_model=ProductListResponse)
-async def get_products(
-    page: int = Query(1, ge=1, description="Page number"),
-    limit: int = Query(20, ge=1, le=50, description="Items per page"),
-    category: Optional[str] = Query(None, description="Filter by category"),
-    search: Optional[str] = Query(None, description="Search products")
-):
-    """Get products with pagination and filtering"""
+PRODUCT_CACHE_CONTROL = os.environ.get("PRODUCT_CACHE_CONTROL", "public, max-age=60")
+LISTING_CACHE_CONTROL = os.environ.get("LISTING_CACHE_CONTROL", "public, max-age=30")
+SUGGEST_CACHE_CONTROL = os.environ.get("SUGGEST_CACHE_CONTROL", "public, max-age=60")
+# Most IDs one batch request may ask for
+PRODUCT_BATCH_LIMIT = int(os.environ.get("PRODUCT_BATCH_LIMIT", "100"))
+
+# Rendered listing bodies keyed by catalog version and query, so repeat and
+# conditional requests skip the database. Writes in other workers show up
+# once the TTL runs out.
+listing_cache = LRUCache(
+    maxsize=int(os.environ.get("LISTING_CACHE_SIZE", "1000")),
+    ttl=float(os.environ.get("LISTING_CACHE_TTL", "10"))
+)
+register_cache("listing", listing_cache)
+
+async def query_product_list(
+    page: int,
+    limit: int,
+    category: Optional[str],
+    search: Optional[str],
+    cursor: Optional[str],
+    exact_count: bool,
+    model: Type[BaseModel],
+    filters: ProductFilters,
+    sort: str
+) -> tuple[List[BaseModel], int, Optional[str]]:
+    """Query one listing page, returning its products, the total count and the next cursor"""
+    if cursor:
+        try:
+            products, next_cursor = await Database.get_products_page(
+                limit=limit,
+                cursor=cursor,
+                category=category,
+                search=search,
+                model=model,
+                filters=filters,
+                sort=sort
+            )
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        total_count = await Database.count_products(category, search, exact=exact_count, filters=filters)
+        return products, total_count, next_cursor
+    
     skip = (page - 1) * limit
     
     products, total_count = await Database.get_products(
         skip=skip,
         limit=limit,
         category=category,
-        search=search
+        search=search,
+        exact_count=exact_count,
+        model=model,
+        filters=filters,
+        sort=sort
     )
     
-    total_pages = math.ceil(total_count / limit)
+    next_cursor = None
+    if len(products) == limit and skip + limit < total_count:
+        next_cursor = Database.product_cursor(products[-1], skip + limit, search, sort)
+    return products, total_count, next_cursor
+
+@router.get("/", response_model=ProductListResponse)
+async def get_products(
+    request: Request,
+    page: int = Query(1, ge=1, description="Page number"),
+    limit: int = Query(20, ge=1, le=50, description="Items per page"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    search: Optional[str] = Query(None, description="Search products"),
+    cursor: Optional[str] = Query(None, description="Continue after the next_cursor of a previous page instead of using page"),
+    exact_count: bool = Query(False, description="Count matching products exactly instead of using a cached estimate"),
+    view: Literal["full", "summary"] = Query("full", description="summary returns grid fields only, without description"),
+    min_price: Optional[float] = Query(None, ge=0, description="Lowest current price"),
+    max_price: Optional[float] = Query(None, ge=0, description="Highest current price"),
+    min_rating: Optional[int] = Query(None, ge=1, le=5, description="Lowest rating"),
+    badge: Optional[str] = Query(None, description="Only products with this badge"),
+    in_stock: Optional[bool] = Query(None, description="Only products that are (or are not) in stock"),
+    sort: Literal["default", "newest", "price_asc", "price_desc", "rating"] = Query(
+        "default", description="default is creation order, or relevance when searching"
+    ),
+    facets: bool = Query(False, description="Also return counts per category, price bucket and rating")
+):
+    """Get products with pagination, filtering and sorting"""
+    model = ProductSummary if view == "summary" else ProductInDB
+    filters = ProductFilters(min_price=min_price, max_price=max_price, min_rating=min_rating, badge=badge, in_stock=in_stock)
+    
+    # Exact counts are asked for to get fresh numbers, so they bypass the cache
+    key = (
+        catalog_version(), page, limit, category, search, cursor, view,
+        min_price, max_price, min_rating, badge, in_stock, sort, facets
+    )
+    entry = None if exact_count else listing_cache.get(key)
+    if entry is None:
+        listing = query_product_list(page, limit, category, search, cursor, exact_count, model, filters, sort)
+        if facets:
+            # The facet aggregation runs alongside the page query
+            (products, total_count, next_cursor), facet_counts = await asyncio.gather(
+                listing, Database.get_product_facets(category, search, filters)
+            )
+        else:
+            products, total_count, next_cursor = await listing
+            facet_counts = None
+        
+        # Cached product payloads are embedded as-is, skipping response_model validation
+        body = orjson.dumps(product_list_content(
+            products,
+            total_pages=math.ceil(total_count / limit),
+            current_page=page,
+            total_count=total_count,
+            next_cursor=next_cursor,
+            facets=facet_counts
+        ))
+        # (body, etag, compressed variants filled in on demand)
+        entry = (body, "W/" + make_etag(body), {})
+        if not exact_count:
+            listing_cache.set(key, entry)
     
-    product_responses = [
-        ProductResponse(
-            _id=product.id,
-            name=product.name,
-            description=product.description,
-            image=product.image,
-            original_price=product.original_price,
-            current_price=product.current_price,
-            rating=product.rating,
-            category=product.category,
-            badge=product.badge,
-            in_stock=product.in_stock,
-            created_at=product.created_at,
-            updated_at=product.updated_at
+    body, etag, encoded_bodies = entry
+    return cacheable_response(request, body, etag, LISTING_CACHE_CONTROL, encoded_bodies=encoded_bodies)
+
+# Declared before /{product_id} so "batch" and "suggest" are not taken for product IDs
+@router.get("/batch", response_model=ProductBatchResponse)
+async def get_products_batch(
+    request: Request,
+    ids: List[str] = Query(..., description="Product IDs, comma-separated or as repeated parameters"),
+    view: Literal["full", "summary"] = Query("full", description="summary returns grid fields only, without description")
+):
+    """Get many products at once in the requested order, listing the IDs that were not found"""
+    product_ids = list(dict.fromkeys(
+        product_id.strip() for value in ids for product_id in value.split(",") if product_id.strip()
+    ))
+    if len(product_ids) > PRODUCT_BATCH_LIMIT:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {PRODUCT_BATCH_LIMIT} products can be requested at once"
         )
-        for product in products
-    ]
     
-    return ProductListResponse(
-        products=product_responses,
-        total_pages=total_pages,
-        current_page=page,
-        total_count=total_count
+    # One $in query for whatever the product cache does not already hold
+    model = ProductSummary if view == "summary" else ProductInDB
+    products = await Database.get_products_by_ids(product_ids, model=model)
+    body = orjson.dumps({
+        "products": [product_fragment(products[product_id]) for product_id in product_ids if product_id in products],
+        "missing": [product_id for product_id in product_ids if product_id not in products],
+    })
+    return cacheable_response(request, body, "W/" + make_etag(body), LISTING_CACHE_CONTROL)
+
+@router.get("/suggest", response_model=List[Suggestion])
+async def suggest_products(
+    q: str = Query(..., min_length=1, max_length=100, description="What the user has typed so far"),
+    limit: int = Query(8, ge=1, le=suggestion_index.capacity, description="Maximum suggestions")
+):
+    """Typeahead suggestions of category and product names, answered from memory"""
+    return ORJSONResponse(
+        suggestion_index.suggest(q, limit),
+        headers={"Cache-Control": SUGGEST_CACHE_CONTROL}
     )
 
 @router.get("/{product_id}", response_model=ProductResponse)
-async def get_product(product_id: str):
+async def get_product(product_id: str, request: Request):
     """Get product by ID"""
     product = await Database.get_product_by_id(product_id)
     if not product:
@@ -61,17 +186,10 @@ async def get_product(product_id: str):
             detail="Product not found"
         )
     
-    return ProductResponse(
-        _id=product.id,
-        name=product.name,
-        description=product.description,
-        image=product.image,
-        original_price=product.original_price,
-        current_price=product.current_price,
-        rating=product.rating,
-        category=product.category,
-        badge=product.badge,
-        in_stock=product.in_stock,
-        created_at=product.created_at,
-        updated_at=product.updated_at
-    )
\ No newline at end of file
+    return cacheable_response(
+        request,
+        product_payload(product),
+        version_etag(product.id, product.updated_at.isoformat()),
+        PRODUCT_CACHE_CONTROL,
+        last_modified=product.updated_at
+    )
@@ -0,0 +1,359 @@
+import math
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Turkish dotted/dotless i has to be handled before lower(), otherwise
+# "İ".lower() produces "i" + a combining dot and "I" becomes a plain "i".
+_TURKISH_UPPER = str.maketrans({"İ": "i", "I": "ı"})
+_TURKISH_FOLD = str.maketrans({
+    "ı": "i",
+    "ş": "s",
+    "ğ": "g",
+    "ü": "u",
+    "ö": "o",
+    "ç": "c",
+    "â": "a",
+    "î": "i",
+    "û": "u",
+})
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase text with Turkish rules and fold it to plain ASCII letters"""
+    text = text.translate(_TURKISH_UPPER).lower().translate(_TURKISH_FOLD)
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into normalized search tokens"""
+    return _TOKEN_RE.findall(normalize_text(text))
+
+
+class ListingFields(NamedTuple):
+    """Fields a search result can be filtered and sorted by without going back to Mongo"""
+    category: str
+    current_price: float
+    rating: int
+    badge: Optional[str]
+    in_stock: bool
+    created_at: datetime
+
+
+class ProductSearchIndex:
+    """In-memory inverted index over product names and descriptions.
+
+    Documents are scored with BM25 using field weights, every query token
+    must match (exact or as a prefix of an indexed term) and results are
+    returned as product ids ordered by relevance. Each document can also
+    carry its ListingFields, so listing filters and sorts apply in memory.
+    """
+
+    def __init__(self, name_weight: float = 3.0, description_weight: float = 1.0,
+                 k1: float = 1.2, b: float = 0.75):
+        self.name_weight = name_weight
+        self.description_weight = description_weight
+        self.k1 = k1
+        self.b = b
+        self.ready = False
+        # Bumped on every change, so results derived from the index can be cached against it
+        self.version = 0
+        self.fields: Dict[str, ListingFields] = {}
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._doc_terms: Dict[str, Dict[str, float]] = {}
+        self._doc_lengths: Dict[str, float] = {}
+        self._doc_categories: Dict[str, str] = {}
+        self._terms: List[str] = []
+        self._total_length = 0.0
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def __contains__(self, product_id: str) -> bool:
+        return product_id in self._doc_terms
+
+    def product_ids(self) -> List[str]:
+        """Return the id of every indexed product"""
+        return list(self._doc_terms)
+
+    def clear(self):
+        """Drop every indexed document"""
+        self.version += 1
+        self.fields.clear()
+        self._postings.clear()
+        self._doc_terms.clear()
+        self._doc_lengths.clear()
+        self._doc_categories.clear()
+        self._terms = []
+        self._total_length = 0.0
+
+    def rebuild(self, products: Iterable[tuple]):
+        """Replace the index contents with (id, name, description, category[, fields]) rows"""
+        self.clear()
+        for row in products:
+            self.add(*row)
+        self.ready = True
+
+    def add(self, product_id: str, name: str, description: str, category: str, fields: Optional[ListingFields] = None):
+        """Index a product, replacing any previous version of it"""
+        if product_id in self._doc_terms:
+            self.remove(product_id)
+        self.version += 1
+        if fields is not None:
+            self.fields[product_id] = fields
+
+        terms: Dict[str, float] = {}
+        for token in tokenize(name):
+            terms[token] = terms.get(token, 0.0) + self.name_weight
+        for token in tokenize(description or ""):
+            terms[token] = terms.get(token, 0.0) + self.description_weight
+
+        length = sum(terms.values())
+        self._doc_terms[product_id] = terms
+        self._doc_lengths[product_id] = length
+        self._doc_categories[product_id] = category
+        self._total_length += length
+
+        for term, weight in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                insort(self._terms, term)
+            postings[product_id] = weight
+
+    def set_fields(self, product_id: str, fields: ListingFields):
+        """Replace the listing fields of an indexed product, e.g. after a stock change"""
+        if product_id in self._doc_terms and self.fields.get(product_id) != fields:
+            self.fields[product_id] = fields
+            self.version += 1
+
+    def remove(self, product_id: str):
+        """Remove a product from the index if it is present"""
+        terms = self._doc_terms.pop(product_id, None)
+        if terms is None:
+            return
+        self.version += 1
+        self.fields.pop(product_id, None)
+
+        self._total_length -= self._doc_lengths.pop(product_id)
+        self._doc_categories.pop(product_id, None)
+
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(product_id, None)
+            if not postings:
+                del self._postings[term]
+                del self._terms[bisect_left(self._terms, term)]
+
+    def _expand(self, token: str) -> List[str]:
+        """Return indexed terms that start with the token"""
+        matches = []
+        position = bisect_left(self._terms, token)
+        while position < len(self._terms) and self._terms[position].startswith(token):
+            matches.append(self._terms[position])
+            position += 1
+        return matches
+
+    def search(self, query: str, category: Optional[str] = None) -> List[str]:
+        """Return ids of products matching every query token, best match first"""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or not self._doc_terms:
+            return []
+
+        doc_count = len(self._doc_terms)
+        average_length = self._total_length / doc_count or 1.0
+        scores: Optional[Dict[str, float]] = None
+
+        # Rarest tokens first so the candidate set shrinks as fast as possible
+        expansions = sorted(
+            ((token, self._expand(token)) for token in tokens),
+            key=lambda item: sum(len(self._postings[term]) for term in item[1])
+        )
+
+        for token, terms in expansions:
+            token_scores: Dict[str, float] = {}
+            for term in terms:
+                postings = self._postings[term]
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                # Exact hits outrank prefix hits on longer terms
+                closeness = len(token) / len(term)
+                for product_id, tf in postings.items():
+                    if scores is not None and product_id not in scores:
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[product_id] / average_length)
+                    score = idf * closeness * tf * (self.k1 + 1) / (tf + norm)
+                    if score > token_scores.get(product_id, 0.0):
+                        token_scores[product_id] = score
+
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {product_id: scores[product_id] + score for product_id, score in token_scores.items()}
+            if not scores:
+                return []
+
+        if category:
+            scores = {
+                product_id: score for product_id, score in scores.items()
+                if self._doc_categories.get(product_id) == category
+            }
+
+        return sorted(scores, key=lambda product_id: (-scores[product_id], product_id))
+
+
+class _TrieNode:
+    __slots__ = ("children", "keys", "top", "stale")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        # Entries whose indexed text ends at this node
+        self.keys: List[str] = []
+        # Best entries anywhere below this node, best first
+        self.top: List[str] = []
+        self.stale = False
+
+
+class SuggestionIndex:
+    """Prefix trie over normalized product and category names for typeahead.
+
+    Names are indexed from the start of every word, so "kahve" finds
+    "Arzum Kahve Makinesi". Every node keeps its best `capacity` entries, so
+    a lookup walks the prefix and slices that list. Removing an entry only
+    marks the nodes it ranked in as stale; their lists are rebuilt from their
+    children's lists on the next lookup that reaches them.
+    """
+
+    def __init__(self, capacity: int = 20, max_key_length: int = 24):
+        self.capacity = capacity
+        self.max_key_length = max_key_length
+        self.ready = False
+        self._root = _TrieNode()
+        # key -> (rank, suggestion)
+        self._entries: Dict[str, Tuple[tuple, Dict[str, Optional[str]]]] = {}
+        self._paths: Dict[str, List[str]] = {}
+        self._bulk_loading = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        """Drop every entry"""
+        self._root = _TrieNode()
+        self._entries.clear()
+        self._paths.clear()
+
+    def rebuild(self, products: Iterable[Tuple[str, str, str, int]], categories: Iterable[Tuple[str, str]]):
+        """Replace the contents with (id, name, category, rating) products and (slug, name) categories"""
+        self.clear()
+        # Insert without ranking, then rank every node in one bottom-up pass
+        self._bulk_loading = True
+        try:
+            for slug, name in categories:
+                self.add_category(slug, name)
+            for product_id, name, category, rating in products:
+                self.add_product(product_id, name, category, rating)
+        finally:
+            self._bulk_loading = False
+        self._refresh(self._root)
+        self.ready = True
+
+    def add_product(self, product_id: str, name: str, category: str, rating: int = 0):
+        """Index a product name, replacing any previous version of it"""
+        # Better rated, then shorter names first; the id keeps ties in a stable order
+        rank = (1, -(rating or 0), len(name), name, product_id)
+        self._add(f"product:{product_id}", rank, {"type": "product", "id": product_id, "text": name, "category": category})
+
+    def add_category(self, slug: str, name: str):
+        """Index a category name; categories rank above products"""
+        rank = (0, 0, len(name), name, slug)
+        self._add(f"category:{slug}", rank, {"type": "category", "id": slug, "text": name, "category": slug})
+
+    def remove_product(self, product_id: str):
+        """Remove a product if it is present"""
+        self._remove(f"product:{product_id}")
+
+    def _add(self, key: str, rank: tuple, suggestion: Dict[str, Optional[str]]):
+        previous = self._entries.get(key)
+        if previous is not None:
+            if previous == (rank, suggestion):
+                return
+            self._remove(key)
+
+        tokens = tokenize(suggestion["text"])
+        paths = list(dict.fromkeys(
+            " ".join(tokens[start:])[:self.max_key_length] for start in range(len(tokens))
+        ))
+        self._entries[key] = (rank, suggestion)
+        self._paths[key] = paths
+
+        for path in paths:
+            node = self._root
+            for char in path:
+                node = node.children.setdefault(char, _TrieNode())
+                if self._bulk_loading:
+                    node.stale = True
+                else:
+                    self._offer(node, key, rank)
+            node.keys.append(key)
+
+    def _offer(self, node: _TrieNode, key: str, rank: tuple):
+        """Put an entry into a node's best list if it ranks high enough"""
+        top = node.top
+        if key in top:
+            return
+        if len(top) >= self.capacity and rank >= self._entries[top[-1]][0]:
+            return
+        position = len(top)
+        while position > 0 and self._entries[top[position - 1]][0] > rank:
+            position -= 1
+        top.insert(position, key)
+        del top[self.capacity:]
+
+    def _remove(self, key: str):
+        if self._entries.pop(key, None) is None:
+            return
+        for path in self._paths.pop(key):
+            node = self._root
+            for char in path:
+                node = node.children.get(char)
+                if node is None:
+                    break
+                if key in node.top:
+                    node.top.remove(key)
+                    node.stale = True
+            else:
+                if key in node.keys:
+                    node.keys.remove(key)
+
+    def _refresh(self, node: _TrieNode):
+        """Rebuild a stale node's best list from its own entries and its children's lists"""
+        candidates = set(node.keys)
+        for child in node.children.values():
+            if child.stale:
+                self._refresh(child)
+            candidates.update(child.top)
+        node.top = sorted(candidates, key=lambda key: self._entries[key][0])[:self.capacity]
+        node.stale = False
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict[str, Optional[str]]]:
+        """Return up to limit suggestions whose name has a word starting with prefix, best first"""
+        path = " ".join(tokenize(prefix))[:self.max_key_length]
+        if not path:
+            return []
+
+        node = self._root
+        for char in path:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        if node.stale:
+            self._refresh(node)
+        return [self._entries[key][1] for key in node.top[:limit]]
+
+
+product_search_index = ProductSearchIndex()
+suggestion_index = SuggestionIndex()
@@ -0,0 +1,45 @@
+from typing import List
+
+from database import Database
+from models import CategoryInDB, ProductInDB
+
+DEFAULT_CATEGORIES = [
+    {"name": "Tüm Ürünler", "slug": "tum-urunler", "description": "Tüm ürünler"},
+    {"name": "Elektrikli Ev Aletleri", "slug": "elektrikli-ev-aletleri", "description": "Elektrikli ev aletleri"},
+    {"name": "Spor Aletleri", "slug": "spor-aletleri", "description": "Spor ve fitness aletleri"},
+    {"name": "Küçük Ev Aletleri", "slug": "kucuk-ev-aletleri", "description": "Küçük ev aletleri"},
+    {"name": "Oyuncak", "slug": "oyuncak", "description": "Oyuncaklar"},
+]
+
+def default_categories() -> List[CategoryInDB]:
+    """Build the default category documents"""
+    return [CategoryInDB(**category) for category in DEFAULT_CATEGORIES]
+
+def default_products() -> List[ProductInDB]:
+    """Build the default products from the frontend mock data"""
+    from data.mockData import mockProducts
+    return [
+        ProductInDB(
+            name=mock_product["name"],
+            description=f"{mock_product['name']} - Yüksek kalite, garantili ürün. Hızlı kargo ile kapınızda!",
+            image=mock_product["image"],  # Use real image URL
+            original_price=mock_product["originalPrice"],
+            current_price=mock_product["currentPrice"],
+            rating=mock_product["rating"],
+            category=mock_product["category"],
+            badge=mock_product.get("badge"),
+            in_stock=True
+        )
+        for mock_product in mockProducts
+    ]
+
+async def seed_defaults():
+    """Insert the default categories and products into empty collections, one insert_many each"""
+    # Check if categories exist
+    existing_categories = await Database.get_categories()
+    if not existing_categories:
+        await Database.create_categories(default_categories())
+
+    # Check if products exist; an estimated count is enough to tell empty from not
+    if await Database.count_products(exact=False) == 0:
+        await Database.create_products(default_products())
@@ -0,0 +1,79 @@
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+import orjson
+from pydantic import BaseModel
+
+from cache import LRUCache
+from metrics import register_cache
+from models import CartItem, OrderInDB, ProductInDB
+
+# Serialized product bodies keyed by (model, id, updated_at), so an update never serves stale bytes
+product_payload_cache = LRUCache(maxsize=int(os.environ.get('PRODUCT_PAYLOAD_CACHE_SIZE', '10000')))
+register_cache("product_payload", product_payload_cache)
+
+
+def product_payload(product: BaseModel) -> bytes:
+    """Return a ProductInDB or ProductSummary serialized as JSON, serializing it only once"""
+    key = (type(product).__name__, product.id, product.updated_at)
+    payload = product_payload_cache.get(key)
+    if payload is None:
+        # ProductInDB has the same fields and aliases as ProductResponse
+        payload = orjson.dumps(product.dict(by_alias=True))
+        product_payload_cache.set(key, payload)
+    return payload
+
+
+def product_fragment(product: BaseModel) -> orjson.Fragment:
+    """Wrap the cached product payload so orjson embeds it without re-encoding"""
+    return orjson.Fragment(product_payload(product))
+
+
+def product_list_content(
+    products: Iterable[BaseModel],
+    total_pages: int,
+    current_page: int,
+    total_count: int,
+    next_cursor: Optional[str] = None,
+    facets: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Build a ProductListResponse body from cached product payloads"""
+    return {
+        "products": [product_fragment(product) for product in products],
+        "total_pages": total_pages,
+        "current_page": current_page,
+        "total_count": total_count,
+        "next_cursor": next_cursor,
+        "facets": facets,
+    }
+
+
+def cart_items_content(items: Iterable[CartItem], products: Dict[str, ProductInDB]) -> List[Dict[str, Any]]:
+    """Build CartItemResponse bodies for the items whose product was found"""
+    return [
+        {
+            "product_id": item.product_id,
+            "product": product_fragment(products[item.product_id]),
+            "quantity": item.quantity,
+        }
+        for item in items
+        if item.product_id in products
+    ]
+
+
+def order_content(order: OrderInDB, products: Dict[str, ProductInDB]) -> Dict[str, Any]:
+    """Build an OrderResponse body from cached product payloads"""
+    return {
+        "_id": order.id,
+        "user_id": order.user_id,
+        "items": cart_items_content(order.items, products),
+        "total": order.total,
+        "shipping": order.shipping,
+        "status": order.status,
+        "shipping_address": order.shipping_address.dict(),
+        "payment_method": order.payment_method,
+        "payment_status": order.payment_status,
+        "created_at": order.created_at,
+        "updated_at": order.updated_at,
+    }
+
@@ -1,13 +1,17 @@
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, Response
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+import asyncio
 import os
 import logging
 from pathlib import Path
 
 # Import routers
-from routers import auth, products, categories, cart, admin
-from database import initialize_database
+from routers import auth, products, categories, cart, orders, admin
+from database import ensure_indexes, initialize_database, ping_database, sync_search_index_forever
+from auth import password_hashing_stats
+from metrics import MetricsMiddleware, render_metrics, mongo_pool_stats, cache_stats
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -16,7 +20,8 @@ load_dotenv(ROOT_DIR / '.env')
 app = FastAPI(
     title="RoboTurkiye E-Commerce API",
     description="E-commerce API for Turkish home appliances and sports products",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Create a router with the /api prefix
@@ -29,13 +34,32 @@ async def root():
 
 @api_router.get("/health")
 async def health_check():
-    return {"status": "healthy", "message": "API is working properly"}
+    """Readiness check; 503 when Mongo does not answer a ping in time"""
+    database = await ping_database()
+    healthy = database["ok"]
+    return ORJSONResponse(
+        {
+            "status": "healthy" if healthy else "unhealthy",
+            "message": "API is working properly" if healthy else "Database is unreachable",
+            "database": database,
+            "mongo_pool": mongo_pool_stats(),
+            "caches": cache_stats(),
+            "password_hashing": password_hashing_stats()
+        },
+        status_code=200 if healthy else 503
+    )
+
+@api_router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    return Response(content=render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 # Include all routers
 api_router.include_router(auth.router)
 api_router.include_router(products.router)
 api_router.include_router(categories.router)
 api_router.include_router(cart.router)
+api_router.include_router(orders.router)
 api_router.include_router(admin.router)
 
 # Include the main router in the app
@@ -49,6 +73,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Added last so it is outermost and times CORS handling as well
+app.add_middleware(MetricsMiddleware)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -58,7 +85,16 @@ logger = logging.getLogger(__name__)
 
 @app.on_event("startup")
 async def startup_db():
+    await ensure_indexes()
     await initialize_database()
     logger.info("Database initialized successfully")
+    # Picks up product writes made by other workers
+    app.state.search_index_sync = asyncio.create_task(sync_search_index_forever())
+
+@app.on_event("shutdown")
+async def stop_search_index_sync():
+    task = getattr(app.state, "search_index_sync", None)
+    if task:
+        task.cancel()
 
 
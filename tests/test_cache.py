@@ -0,0 +1,88 @@
+import pytest
+
+import cache
+from cache import LRUCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+def test_get_counts_hits_and_misses():
+    lru = LRUCache(maxsize=2)
+    assert lru.get("a") is None
+    lru.set("a", 1)
+    assert lru.get("a") == 1
+    assert lru.get("b", "default") == "default"
+
+    stats = lru.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+    assert stats["hit_ratio"] == pytest.approx(1 / 3)
+
+
+def test_entries_expire_after_ttl(clock):
+    lru = LRUCache(maxsize=10, ttl=30)
+    lru.set("a", 1)
+
+    clock.now += 29.9
+    assert "a" in lru
+    assert lru.get("a") == 1
+
+    clock.now += 0.1
+    assert "a" not in lru
+    assert lru.get("a") is None
+    assert len(lru) == 0
+
+
+def test_set_restarts_ttl(clock):
+    lru = LRUCache(maxsize=10, ttl=30)
+    lru.set("a", 1)
+    clock.now += 20
+    lru.set("a", 2)
+    clock.now += 20
+    assert lru.get("a") == 2
+
+
+def test_no_ttl_never_expires(clock):
+    lru = LRUCache(maxsize=10)
+    lru.set("a", 1)
+    clock.now += 10 ** 9
+    assert lru.get("a") == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    lru = LRUCache(maxsize=2)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    # Reading a makes b the least recently used
+    lru.get("a")
+    lru.set("c", 3)
+
+    assert "a" in lru
+    assert "b" not in lru
+    assert "c" in lru
+    assert lru.stats()["evictions"] == 1
+    assert len(lru) == 2
+
+
+def test_invalidate_and_clear():
+    lru = LRUCache(maxsize=10)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    lru.invalidate("a")
+    lru.invalidate("missing")
+    assert "a" not in lru and "b" in lru
+
+    lru.clear()
+    assert len(lru) == 0
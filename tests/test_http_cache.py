@@ -0,0 +1,88 @@
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from starlette.requests import Request
+
+from http_cache import choose_encoding, etag_matches, http_date, is_not_modified, make_etag, version_etag
+
+
+def make_request(**headers) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+UPDATED_AT = datetime(2024, 5, 1, 12, 30, 15, 500000)
+
+
+def test_make_etag_is_strong_and_stable():
+    etag = make_etag(b"body")
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == make_etag(b"body")
+    assert etag != make_etag(b"other body")
+
+
+def test_version_etag_is_weak():
+    assert version_etag("id", UPDATED_AT.isoformat()).startswith('W/"')
+    assert version_etag("id", 1) != version_etag("id", 2)
+
+
+def test_etag_matches_compares_weakly():
+    etag = version_etag("id", 1)
+    assert etag_matches(etag, etag)
+    assert etag_matches(etag[2:], etag)
+    assert etag_matches("W/" + make_etag(b"body"), make_etag(b"body"))
+
+
+def test_etag_matches_lists_and_wildcard():
+    etag = make_etag(b"body")
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches("", etag)
+
+
+def test_not_modified_by_if_none_match():
+    etag = make_etag(b"body")
+    assert is_not_modified(make_request(if_none_match=etag), etag)
+    assert not is_not_modified(make_request(if_none_match='"other"'), etag)
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    etag = make_etag(b"body")
+    request = make_request(if_none_match='"other"', if_modified_since=http_date(UPDATED_AT))
+    assert not is_not_modified(request, etag, UPDATED_AT)
+
+
+def test_not_modified_by_if_modified_since():
+    etag = make_etag(b"body")
+    # Last-Modified drops the microseconds, so the header echoed back still matches
+    assert is_not_modified(make_request(if_modified_since=http_date(UPDATED_AT)), etag, UPDATED_AT)
+    assert not is_not_modified(make_request(if_modified_since="Wed, 01 May 2024 12:30:14 GMT"), etag, UPDATED_AT)
+    assert not is_not_modified(make_request(if_modified_since="not a date"), etag, UPDATED_AT)
+    assert not is_not_modified(make_request(if_modified_since=http_date(UPDATED_AT)), etag)
+
+
+def test_choose_encoding_honours_quality():
+    assert choose_encoding("gzip") == "gzip"
+    assert choose_encoding("gzip;q=0") is None
+    assert choose_encoding("gzip;q=0, identity") is None
+    assert choose_encoding("GZIP ; q=0.5") == "gzip"
+    assert choose_encoding("gzip;q=nonsense") is None
+    assert choose_encoding(None) is None
+    assert choose_encoding("deflate") is None
+
+
+def test_choose_encoding_prefers_brotli_when_available():
+    import http_cache
+
+    expected = "br" if http_cache.brotli is not None else "gzip"
+    assert choose_encoding("gzip, br") == expected
+    assert choose_encoding("gzip, br;q=0") == "gzip"
@@ -0,0 +1,73 @@
+from datetime import datetime
+
+import pytest
+
+from pagination import decode_cursor, encode_cursor, keyset_filter, keyset_position
+
+
+def test_cursor_round_trip():
+    values = [19.99, "product-id", "price_asc"]
+    assert decode_cursor(encode_cursor(values)) == values
+
+
+def test_cursor_round_trip_keeps_datetimes():
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 123456)
+    assert decode_cursor(encode_cursor([created_at, "product-id"])) == [created_at, "product-id"]
+
+
+def test_cursor_is_url_safe_without_padding():
+    cursor = encode_cursor([datetime(2024, 1, 1), "ü?&/+"])
+    assert "=" not in cursor
+    assert all(char.isalnum() or char in "-_" for char in cursor)
+
+
+def test_encode_cursor_rejects_unknown_types():
+    with pytest.raises(TypeError):
+        encode_cursor([object()])
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor!", "bm90IGpzb24", "eyJhIjoxfQ"])
+def test_decode_cursor_rejects_malformed_input(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_keyset_filter_ascending():
+    assert keyset_filter("current_price", 1, 10.0, "b") == {
+        "$or": [
+            {"current_price": {"$gt": 10.0}},
+            {"current_price": 10.0, "_id": {"$gt": "b"}},
+        ]
+    }
+
+
+def test_keyset_filter_descending():
+    assert keyset_filter("rating", -1, 4, "b") == {
+        "$or": [
+            {"rating": {"$lt": 4}},
+            {"rating": 4, "_id": {"$lt": "b"}},
+        ]
+    }
+
+
+def test_keyset_position_of_default_sort_cursor():
+    created_at = datetime(2024, 1, 1)
+    assert keyset_position(decode_cursor(encode_cursor([created_at, "id"]))) == (created_at, "id")
+
+
+def test_keyset_position_of_named_sort_cursor():
+    assert keyset_position([10.0, "id", "price_asc"], "price_asc") == (10.0, "id")
+
+
+@pytest.mark.parametrize("values, sort", [
+    ([10.0, "id", "price_asc"], None),
+    ([10.0, "id", "price_asc"], "price_desc"),
+    ([datetime(2024, 1, 1), "id"], "newest"),
+    (["id"], None),
+    ([], None),
+    ([10.0, "id", "price_asc", "extra"], "price_asc"),
+])
+def test_keyset_position_rejects_cursor_of_another_sort(values, sort):
+    # The listing routes turn this ValueError into 400 Invalid cursor
+    with pytest.raises(ValueError):
+        keyset_position(values, sort)
@@ -0,0 +1,183 @@
+import random
+
+import pytest
+
+from search import ProductSearchIndex, SuggestionIndex, normalize_text, tokenize
+
+
+@pytest.fixture
+def index():
+    index = ProductSearchIndex()
+    index.rebuild([
+        ("p1", "Robot Süpürge", "Akıllı robot süpürge, haritalama özellikli", "ev-aletleri"),
+        ("p2", "Kahve Makinesi", "Filtre kahve makinesi", "mutfak"),
+        ("p3", "Robot Oyuncak", "Uzaktan kumandalı oyuncak robot", "oyuncak"),
+        ("p4", "Türk Kahvesi Makinesi", "Köpüklü Türk kahvesi", "mutfak"),
+    ])
+    return index
+
+
+def test_normalize_text_folds_turkish_letters():
+    assert normalize_text("İSTANBUL") == "istanbul"
+    assert normalize_text("IŞIK") == "isik"
+    assert normalize_text("ılık") == "ilik"
+    assert normalize_text("Şeker Ğ ğ") == "seker g g"
+    assert normalize_text("Çöp Üzüm") == "cop uzum"
+
+
+def test_tokenize_splits_on_non_word_characters():
+    assert tokenize("Akıllı-Robot, SÜPÜRGE!") == ["akilli", "robot", "supurge"]
+
+
+def test_search_matches_folded_text(index):
+    assert index.search("supurge") == ["p1"]
+    assert index.search("SÜPÜRGE") == ["p1"]
+
+
+def test_search_matches_prefixes(index):
+    assert set(index.search("kah")) == {"p2", "p4"}
+    assert set(index.search("rob")) == {"p1", "p3"}
+
+
+def test_exact_term_outranks_prefix_match():
+    index = ProductSearchIndex()
+    index.rebuild([
+        ("long", "Kahveci", "", "mutfak"),
+        ("exact", "Kahve", "", "mutfak"),
+    ])
+    assert index.search("kahve") == ["exact", "long"]
+
+
+def test_name_match_outranks_description_match():
+    index = ProductSearchIndex()
+    index.rebuild([
+        ("description", "Blender", "Robot gibi çalışır", "mutfak"),
+        ("name", "Robot", "Temizlik", "ev-aletleri"),
+    ])
+    assert index.search("robot") == ["name", "description"]
+
+
+def test_every_token_is_required(index):
+    assert index.search("robot oyuncak") == ["p3"]
+    assert index.search("robot kahve") == []
+    assert index.search("robot bulunmayan") == []
+
+
+def test_category_filter(index):
+    assert index.search("robot", category="oyuncak") == ["p3"]
+    assert index.search("kahve", category="oyuncak") == []
+
+
+def test_empty_query_returns_nothing(index):
+    assert index.search("") == []
+    assert index.search("  ,. ") == []
+
+
+def test_add_replaces_previous_version(index):
+    index.add("p2", "Çay Makinesi", "Demlikli", "mutfak")
+    assert index.search("kahve") == ["p4"]
+    assert index.search("cay") == ["p2"]
+    assert len(index) == 4
+
+
+def test_add_then_remove_leaves_no_stale_terms():
+    index = ProductSearchIndex()
+    index.add("p1", "Robot Süpürge", "Akıllı", "ev-aletleri")
+    index.add("p2", "Robot Oyuncak", "", "oyuncak")
+    index.remove("p1")
+
+    assert index.search("supurge") == []
+    assert index.search("akilli") == []
+    assert index.search("robot") == ["p2"]
+    assert "supurge" not in index._postings
+    assert "akilli" not in index._postings
+    assert index._terms == sorted(index._postings)
+
+    index.remove("p2")
+    assert len(index) == 0
+    assert index._postings == {}
+    assert index._terms == []
+    assert index._total_length == 0
+
+
+def test_remove_unknown_product_is_a_no_op(index):
+    index.remove("missing")
+    assert len(index) == 4
+
+
+def _brute_force_suggest(products, categories, prefix, limit, max_key_length):
+    """Rank every entry whose name has a word starting with prefix, as SuggestionIndex should"""
+    path = " ".join(tokenize(prefix))[:max_key_length]
+    if not path:
+        return []
+
+    def matches(text):
+        tokens = tokenize(text)
+        return any(" ".join(tokens[start:])[:max_key_length].startswith(path) for start in range(len(tokens)))
+
+    ranked = [
+        ((0, 0, len(name), name, slug), {"type": "category", "id": slug, "text": name, "category": slug})
+        for slug, name in categories.items() if matches(name)
+    ] + [
+        ((1, -rating, len(name), name, product_id), {"type": "product", "id": product_id, "text": name, "category": category})
+        for product_id, (name, category, rating) in products.items() if matches(name)
+    ]
+    return [suggestion for _, suggestion in sorted(ranked, key=lambda item: item[0])[:limit]]
+
+
+def test_suggestions_rank_categories_then_rating_then_length():
+    index = SuggestionIndex()
+    index.rebuild(
+        [("p1", "Robot Süpürge Pro", "ev", 4), ("p2", "Robot Süpürge", "ev", 4), ("p3", "Oyuncak Robot", "oyuncak", 5)],
+        [("robotlar", "Robotlar")]
+    )
+    assert [suggestion["id"] for suggestion in index.suggest("rob")] == ["robotlar", "p3", "p2", "p1"]
+    assert [suggestion["id"] for suggestion in index.suggest("robot sup")] == ["p2", "p1"]
+    assert index.suggest("") == []
+    assert index.suggest("yok") == []
+
+
+def test_suggestion_ties_are_ordered_by_id():
+    index = SuggestionIndex()
+    for product_id in ["c", "a", "b"]:
+        index.add_product(product_id, "Kahve Makinesi", "mutfak", 4)
+    assert [suggestion["id"] for suggestion in index.suggest("kahve")] == ["a", "b", "c"]
+
+
+def test_suggestions_match_brute_force_under_random_updates():
+    rng = random.Random(7)
+    words = ["robot", "süpürge", "kahve", "makinesi", "akıllı", "koşu", "bandı", "kask", "kamera", "robotik"]
+    index = SuggestionIndex(capacity=5, max_key_length=12)
+    products = {}
+    categories = {}
+
+    def random_name():
+        return " ".join(rng.choice(words).capitalize() for _ in range(rng.randint(1, 3)))
+
+    initial = {f"p{number}": (random_name(), "genel", rng.randint(1, 5)) for number in range(40)}
+    products.update(initial)
+    categories["kahve"] = "Kahve"
+    index.rebuild(((product_id, *values) for product_id, values in initial.items()), categories.items())
+
+    prefixes = ["r", "ro", "rob", "robot", "robotik", "k", "ka", "kah", "kas", "s", "sup", "robot s", "kahve m", "akilli r", "x"]
+    for step in range(2000):
+        action = rng.random()
+        if action < 0.35:
+            product_id = f"p{rng.randint(0, 60)}"
+            products[product_id] = (random_name(), "genel", rng.randint(1, 5))
+            index.add_product(product_id, *products[product_id])
+        elif action < 0.6:
+            product_id = f"p{rng.randint(0, 60)}"
+            products.pop(product_id, None)
+            index.remove_product(product_id)
+        elif action < 0.63:
+            slug = rng.choice(["robotlar", "kameralar"])
+            categories[slug] = slug.capitalize()
+            index.add_category(slug, categories[slug])
+        else:
+            prefix = rng.choice(prefixes)
+            limit = rng.randint(1, index.capacity)
+            expected = _brute_force_suggest(products, categories, prefix, limit, index.max_key_length)
+            assert index.suggest(prefix, limit) == expected, (step, prefix, limit)
+
+    assert len(index) == len(products) + len(categories)